@@ -6,6 +6,10 @@ Pandas adapters for sklearn-type estimators
 from ._base import *
 from ._adapter import *
 from ._function_transformer import *
+from ._conversion import *
+from ._persistence import *
+from ._cache import *
+from ._instrumentation import *
 import sklearn
 
 
@@ -17,14 +21,24 @@ __all__ += ['__version__']
 
 __all__ += ['FrameMixin']
 
+__all__ += ['FeatureUnionFitError']
+
 __all__ += ['frame']
 
 __all__ += ['trans']
 
 __all__ += ['sklearn']
 
+__all__ += ['dump', 'load']
+
+__all__ += ['ResultCache', 'MemoryCache', 'frame_fingerprint']
+
+__all__ += ['profile', 'Profile', 'StepRecord']
+
+__all__ += ['set_dtype_policy', 'dtype_policy', 'set_sparse_format', 'conversion_stats', 'reset_conversion_stats']
+
 
-def trans(func=None, in_cols=None, out_cols=None, pass_y=False, kw_args=None):
+def trans(func=None, in_cols=None, out_cols=None, pass_y=False, kw_args=None, n_jobs=None, chunk_size=None, cache=None):
     """
     Arguments:
 
@@ -33,6 +47,14 @@ def trans(func=None, in_cols=None, out_cols=None, pass_y=False, kw_args=None):
             * ``None``
             * a callable
             * a step
+            * a list of pairs (or a mapping) from output columns to expression strings over the
+                input columns (e.g., ``[('ratio', 'a / b'), ('log_a', 'log(a)')]``). If :mod:`numexpr`
+                is installed, each expression is evaluated by it in a single vectorized pass; otherwise,
+                the expressions are evaluated by :func:`pandas.eval`, an operation at a time.
+                Unless given otherwise, ``in_cols`` are the columns the expressions reference, and
+                ``out_cols`` are the keys, in the order of the pairs (or of iterating the mapping,
+                which, for a ``dict``, is arbitrary before Python 3.7; use an
+                :class:`collections.OrderedDict` for a fixed order).
 
         in_cols: One of:
 
@@ -46,16 +68,40 @@ def trans(func=None, in_cols=None, out_cols=None, pass_y=False, kw_args=None):
 
         kw_args:
 
+        n_jobs: If not ``None`` (or 1), and ``func`` is a callable, the number of worker processes between
+            which to split the rows in ``transform`` (negative numbers count back from the number of CPUs,
+            as in :mod:`sklearn`). The workers persist between calls, and ``func`` must be picklable
+            (e.g., a module-level function).
+
+        chunk_size: If ``n_jobs`` is used, the maximal number of rows passed to ``func`` at a time;
+            if ``None``, the rows are split evenly between the workers.
+
+        cache: If not ``None``, and ``func`` is a callable or expressions, a :class:`ibex.MemoryCache`,
+            a :class:`ibex.ResultCache`, or the directory of one, in which ``transform`` memoizes its
+            results. These are keyed by a fingerprint of the input columns (including the index; see
+            :func:`ibex.frame_fingerprint`), the code (or identity) of ``func``, and ``kw_args``, so
+            ``func`` should depend on nothing else.
+
     Returns:
 
         An :py:class:`sklearn.preprocessing.FunctionTransformer` object.
 
     Example:
+
+        >>> import pandas as pd
+        >>> from ibex import trans
+        >>>
+        >>> X = pd.DataFrame({'a': [1., 2., 4.], 'b': [2., 2., 8.], 'c': [0, 0, 0]})
+        >>> trans([('ratio', 'a / b'), ('diff', 'b - a')]).fit_transform(X)
+           ratio  diff
+        0    0.5   1.0
+        1    1.0   0.0
+        2    0.5   4.0
     """
 
     from ibex.sklearn import preprocessing
 
-    return preprocessing.FunctionTransformer(func, in_cols, out_cols, pass_y, kw_args)
+    return preprocessing.FunctionTransformer(func, in_cols, out_cols, pass_y, kw_args, n_jobs, chunk_size, cache)
 
 __all__ += ['trans']
 
@@ -2,28 +2,134 @@ from __future__ import absolute_import
 
 
 import inspect
+import weakref
+import functools
+import threading
+import collections
 
 import six
 import numpy as np
 import pandas as pd
+from scipy import sparse
+import sklearn
 from sklearn import pipeline
 
 from ._verify_args import verify_x_type, verify_y_type
-from ._utils import update_method_wrapper, update_class_wrapper
+from ._utils import update_method_wrapper, update_class_wrapper, batched_call
+from ._column_plan import _ColumnPlan
+from ._conversion import frame_to_array, records_to_array, records_to_frame, result_columns, result_to_frame
+from ._parallel import in_op, enter_op, exit_op, parallel_call
+from . import _instrumentation
 
 
 __all__ = []
 
 
-def _from_pickle(est, params):
-    return frame(est)(**params)
+_wrapped = [
+    'fit_transform',
+    'predict_proba',
+    'sample_y',
+    'score_samples',
+    'score',
+    'staged_predict_proba',
+    'apply',
+    'bic',
+    'perplexity',
+    'fit',
+    'decision_function',
+    'aic',
+    'partial_fit',
+    'predict',
+    'radius_neighbors',
+    'staged_decision_function',
+    'staged_predict',
+    'inverse_transform',
+    'fit_predict',
+    'kneighbors',
+    'predict_log_proba',
+    'transform',
+]
+
+
+# Wrapped methods which support ``batch_size``, and have ``*_iter`` variants.
+_batched = [
+    'predict',
+    'predict_proba',
+    'decision_function',
+    'transform',
+]
+
+
+_MethodSignature = collections.namedtuple('_MethodSignature', ['params', 'y_arg', 'sample_weight_arg'])
+
+
+def _method_params(est, name):
+    base_attr = getattr(est, name)
+    if six.PY3:
+        return list(inspect.signature(base_attr).parameters)
+    return inspect.getargspec(base_attr)[0]
+
+
+def _make_signature_table(est):
+    """
+    Introspects, once per class, the wrapped methods of ``est``.
+
+    Returns:
+        A ``dict`` mapping each wrapped method name ``est`` supports, to a
+        :class:`_MethodSignature` holding its parameter names, and the indices
+        of ``y`` and ``sample_weight`` within the positional arguments following
+        ``X`` (or ``None`` if the method takes no such parameter).
+    """
+    table = {}
+    for name in _wrapped:
+        if not hasattr(est, name):
+            continue
+        try:
+            params = _method_params(est, name)
+        except (TypeError, ValueError):
+            params = []
+        y_arg = 0 if len(params) > 2 and params[2] == 'y' else None
+        sample_weight_arg = params.index('sample_weight') - 2 if 'sample_weight' in params[2:] else None
+        table[name] = _MethodSignature(params, y_arg, sample_weight_arg)
+    return table
+
+
+def _arg(args, kwargs, index, name):
+    if index is None:
+        return None
+    if len(args) > index:
+        return args[index]
+    return kwargs.get(name)
+
 
+def _from_pickle(est, params, state=None):
+    obj = frame(est)(**params)
+    if state is not None:
+        obj.__dict__.update(state)
+    return obj
 
-def make_adapter(est):
+
+def make_adapter(est, methods=None):
+    """
+    Creates an adapter class of ``est``.
+
+    Arguments:
+        est: An estimator class.
+        methods: Optionally, a ``dict`` mapping the name of each wrapped method ``est`` supports,
+            to a specialized implementation calling ``_ibex_run`` (see ``scripts/generate.py``).
+            If ``None``, the wrapped methods are defined generically.
+    """
     from ._base import FrameMixin
 
 
+    signatures = _make_signature_table(est)
+    array_input = not issubclass(est, FrameMixin)
+
+
     class _Adapter(est, FrameMixin):
+        _ibex_signatures = signatures
+        _ibex_array_input = array_input
+
         def __repr__(self):
             parts = est.__repr__(self).split('(', 1)
             return 'Adapter[' + parts[0] + '](' + parts[1]
@@ -31,127 +137,262 @@ def make_adapter(est):
         def __str__(self):
             return self.__repr__()
 
-        def fit_transform(self, X, *args):
-            return self.__run(super(_Adapter, self).fit_transform, 'fit_transform', X, *args)
+        # Unless the adapter is specialized (see ``scripts/generate.py``), every wrapped method is defined
+        # generically, and those which ``est`` lacks are removed by ``frame``.
+        if methods is None:
+            def fit_transform(self, X, *args, **kwargs):
+                return self.__run(super(_Adapter, self).fit_transform, 'fit_transform', X, *args, **kwargs)
+
+            def predict_proba(self, X, *args, **kwargs):
+                return self.__run(super(_Adapter, self).predict_proba, 'predict_proba', X, *args, **kwargs)
+
+            def sample_y(self, X, *args, **kwargs):
+                return self.__run(super(_Adapter, self).sample_y, 'sample_y', X, *args, **kwargs)
+
+            def score_samples(self, X, *args, **kwargs):
+                return self.__run(super(_Adapter, self).score_samples, 'score_samples', X, *args, **kwargs)
+
+            def staged_predict_proba(self, X, *args, **kwargs):
+                return self.__run(super(_Adapter, self).staged_predict_proba, 'staged_predict_proba', X, *args, **kwargs)
+
+            def apply(self, X, *args, **kwargs):
+                return self.__run(super(_Adapter, self).apply, 'apply', X, *args, **kwargs)
+
+            def bic(self, X, *args, **kwargs):
+                return self.__run(super(_Adapter, self).bic, 'bic', X, *args, **kwargs)
+
+            def perplexity(self, X, *args, **kwargs):
+                return self.__run(super(_Adapter, self).perplexity, 'perplexity', X, *args, **kwargs)
+
+            def fit(self, X, *args, **kwargs):
+                """
+                Shmippy shmoppoo
+                """
+                return self.__run(super(_Adapter, self).fit, 'fit', X, *args, **kwargs)
+
+            def decision_function(self, X, *args, **kwargs):
+                return self.__run(super(_Adapter, self).decision_function, 'decision_function', X, *args, **kwargs)
+
+            def aic(self, X, *args, **kwargs):
+                return self.__run(super(_Adapter, self).aic, 'aic', X, *args, **kwargs)
+
+            def partial_fit(self, X, *args, **kwargs):
+                return self.__run(super(_Adapter, self).partial_fit, 'partial_fit', X, *args, **kwargs)
+
+            def predict(self, X, *args, **kwargs):
+                return self.__run(super(_Adapter, self).predict, 'predict', X, *args, **kwargs)
+
+            def radius_neighbors(self, X, *args, **kwargs):
+                return self.__run(super(_Adapter, self).radius_neighbors, 'radius_neighbors', X, *args, **kwargs)
 
-        def predict_proba(self, X, *args):
-            return self.__run(super(_Adapter, self).predict_proba, 'predict_proba', X, *args)
+            def staged_decision_function(self, X, *args, **kwargs):
+                return self.__run(super(_Adapter, self).staged_decision_function, 'staged_decision_function', X, *args, **kwargs)
 
-        def sample_y(self, X, *args):
-            return self.__run(super(_Adapter, self).sample_y, 'sample_y', X, *args)
+            def staged_predict(self, X, *args, **kwargs):
+                return self.__run(super(_Adapter, self).staged_predict, 'staged_predict', X, *args, **kwargs)
 
-        def score_samples(self, X, *args):
-            return self.__run(super(_Adapter, self).score_samples, 'score_samples', X, *args)
+            def inverse_transform(self, X, *args, **kwargs):
+                return self.__run(super(_Adapter, self).inverse_transform, 'inverse_transform', X, *args, **kwargs)
 
-        def staged_predict_proba(self, X, *args):
-            return self.__run(super(_Adapter, self).staged_predict_proba, 'staged_predict_proba', X, *args)
+            def fit_predict(self, X, *args, **kwargs):
+                return self.__run(super(_Adapter, self).fit_predict, 'fit_predict', X, *args, **kwargs)
 
-        def apply(self, X, *args):
-            return self.__run(super(_Adapter, self).apply, 'apply', X, *args)
+            def kneighbors(self, X, *args, **kwargs):
+                return self.__run(super(_Adapter, self).kneighbors, 'kneighbors', X, *args, **kwargs)
 
-        def bic(self, X, *args):
-            return self.__run(super(_Adapter, self).bic, 'bic', X, *args)
+            def predict_log_proba(self, X, *args, **kwargs):
+                return self.__run(super(_Adapter, self).predict_log_proba, 'predict_log_proba', X, *args, **kwargs)
 
-        def perplexity(self, X, *args):
-            return self.__run(super(_Adapter, self).perplexity, 'perplexity', X, *args)
+            def transform(self, X, *args, **kwargs):
+                return self.__run(super(_Adapter, self).transform, 'transform', X, *args, **kwargs)
 
-        def fit(self, X, *args):
+            def score(self, X, *args, **kwargs):
+                return self.__run(super(_Adapter, self).score, 'score', X, *args, **kwargs)
+
+        def predict_iter(self, Xs, *args, **kwargs):
+            """
+            Lazily predicts each of an iterable of :class:`pandas.DataFrame` objects (e.g., the chunks
+            read by :func:`pandas.read_csv` with ``chunksize``), yielding the results in order.
+            """
+            for X in Xs:
+                yield self.predict(X, *args, **kwargs)
+
+        def predict_proba_iter(self, Xs, *args, **kwargs):
+            """
+            Lazily calls ``predict_proba`` on each of an iterable of :class:`pandas.DataFrame` objects,
+            yielding the results in order.
+            """
+            for X in Xs:
+                yield self.predict_proba(X, *args, **kwargs)
+
+        def decision_function_iter(self, Xs, *args, **kwargs):
             """
-            Shmippy shmoppoo
+            Lazily calls ``decision_function`` on each of an iterable of :class:`pandas.DataFrame` objects,
+            yielding the results in order.
             """
-            return self.__run(super(_Adapter, self).fit, 'fit', X, *args)
+            for X in Xs:
+                yield self.decision_function(X, *args, **kwargs)
 
-        def decision_function(self, X, *args):
-            return self.__run(super(_Adapter, self).decision_function, 'decision_function', X, *args)
+        def transform_iter(self, Xs, *args, **kwargs):
+            """
+            Lazily transforms each of an iterable of :class:`pandas.DataFrame` objects,
+            yielding the results in order.
+            """
+            for X in Xs:
+                yield self.transform(X, *args, **kwargs)
 
-        def aic(self, X, *args):
-            return self.__run(super(_Adapter, self).aic, 'aic', X, *args)
+        def predict_record(self, record):
+            """
+            Predicts a single record, bypassing the construction of :mod:`pandas` objects.
 
-        def partial_fit(self, X, *args):
-            return self.__run(super(_Adapter, self).partial_fit, 'partial_fit', X, *args)
+            Arguments:
 
-        def predict(self, X, *args):
-            return self.__run(super(_Adapter, self).predict, 'predict', X, *args)
+                record: A mapping (e.g., a ``dict``) from each column seen in ``fit``, to its value.
 
-        def radius_neighbors(self, X, *args):
-            return self.__run(super(_Adapter, self).radius_neighbors, 'radius_neighbors', X, *args)
+            Returns:
 
-        def staged_decision_function(self, X, *args):
-            return self.__run(super(_Adapter, self).staged_decision_function, 'staged_decision_function', X, *args)
+                The prediction, as a plain Python scalar (or a ``list``, for multi-output estimators).
+            """
+            return self.predict_records([record])[0]
 
-        def staged_predict(self, X, *args):
-            return self.__run(super(_Adapter, self).staged_predict, 'staged_predict', X, *args)
+        def predict_records(self, records):
+            """
+            Predicts a sequence of records, bypassing the construction of :mod:`pandas` objects.
+
+            Arguments:
 
-        def inverse_transform(self, X, *args):
-            return self.__run(super(_Adapter, self).inverse_transform, 'inverse_transform', X, *args)
+                records: An iterable of mappings (e.g., ``dict`` objects) from each column seen in ``fit``,
+                    to its value.
 
-        def fit_predict(self, X, *args):
-            return self.__run(super(_Adapter, self).fit_predict, 'fit_predict', X, *args)
+            Returns:
 
-        def kneighbors(self, X, *args):
-            return self.__run(super(_Adapter, self).kneighbors, 'kneighbors', X, *args)
+                A ``list`` of the predictions, as plain Python objects.
+            """
+            records = list(records)
+            if not array_input:
+                return self.predict(records_to_frame(records, self.x_columns)).values.tolist()
+            return self._ibex_raw_call('predict', records_to_array(records, self.x_columns)).tolist()
 
-        def predict_log_proba(self, X, *args):
-            return self.__run(super(_Adapter, self).predict_log_proba, 'predict_log_proba', X, *args)
+        def _ibex_raw_call(self, name, X):
+            """
+            Calls method ``name`` of the adapted estimator directly on the array ``X``, whose columns
+            are in the order seen in ``fit``.
+            """
+            return _instrumentation.call(self, name, X, self.__raw_call, name, (), {})
 
-        def transform(self, X, *args):
-            return self.__run(super(_Adapter, self).transform, 'transform', X, *args)
+        def __raw_call(self, X, name, args, kwargs):
+            enter_op(self)
+            try:
+                return getattr(super(_Adapter, self), name)(X, *args, **kwargs)
+            finally:
+                exit_op(self)
 
-        def score(self, X, *args):
-            return self.__run(super(_Adapter, self).score, 'score', X, *args)
+        def _ibex_array_call(self, name, X, columns, *args, **kwargs):
+            """
+            Calls method ``name`` of the adapted estimator directly on ``X``: either a frame, or an array
+            standing for one with ``columns`` (in the order seen in ``fit``, unless fitting).
 
-        def __run(self, fn, name, X, *args):
-            if hasattr(self, '_ibex_in_op'):
-                return fn(X, *args)
+            Returns:
+                A pair of the raw result, and the columns of a frame of it (see :func:`result_columns`).
+            """
+            if isinstance(X, pd.DataFrame):
+                if name.startswith('fit'):
+                    self.x_columns = X.columns
+                    self._ibex_column_plan = _ColumnPlan(X.columns)
+                X = self.__column_plan().take(X)
+                columns, X = X.columns, frame_to_array(X)
+            elif name.startswith('fit'):
+                self.x_columns = pd.Index(columns)
+                self._ibex_column_plan = _ColumnPlan(self.x_columns)
+
+            res = _instrumentation.call(self, name, X, self.__raw_call, name, args, kwargs)
+
+            if not (isinstance(res, np.ndarray) or sparse.issparse(res)) or len(res.shape) != 2:
+                return res, None
+            return res, result_columns(columns, res)
+
+        def __run(self, fn, name, X, *args, **kwargs):
+            if in_op(self):
+                return fn(X, *args, **kwargs)
+
+            signature = signatures[name]
+            return self._ibex_run(
+                fn,
+                name,
+                X,
+                args,
+                kwargs,
+                _arg(args, kwargs, signature.y_arg, 'y'),
+                _arg(args, kwargs, signature.sample_weight_arg, 'sample_weight'))
+
+        def _ibex_run(self, fn, name, X, args, kwargs, y=None, sample_weight=None, wrap_res=True):
+            """
+            Calls ``fn``, the adapted estimator's method ``name``, on ``X`` and the rest of the arguments,
+            ``args`` and ``kwargs``. Of these, ``y`` and ``sample_weight`` are checked to be aligned with
+            ``X``. Unless ``wrap_res`` is ``False``, array results are converted to :mod:`pandas` objects.
+            """
+            if in_op(self):
+                return fn(X, *args, **kwargs)
 
             if not isinstance(X, pd.DataFrame):
                 verify_x_type(X)
 
+            # Only the methods whose rows are independent (and which take no y) are split into
+            # parallel chunks or batches; others receive these keywords as they would without the adapter.
+            if name in _batched:
+                n_jobs = kwargs.pop('n_jobs', None)
+                backend = kwargs.pop('backend', 'threading')
+                if n_jobs is not None and n_jobs != 1:
+                    return parallel_call(self, name, X, n_jobs, backend, *args, **kwargs)
+
+                batch_size = kwargs.pop('batch_size', None)
+                if batch_size is not None:
+                    return batched_call(functools.partial(self.__run, fn, name), X, batch_size, *args, **kwargs)
+
             # Tmp Ami - why not in function adapter? where are uts?
             if name.startswith('fit'):
                 self.x_columns = X.columns
+                self._ibex_column_plan = _ColumnPlan(X.columns)
 
-            base_attr = getattr(est, name)
-            if six.PY3:
-                params = list(inspect.signature(base_attr).parameters)
-            else:
-                params = inspect.getargspec(base_attr)[0]
             # Tmp Ami - write a ut for this; remove todo from docs
-            if len(params) > 2 and params[2] == 'y' and len(args) > 0 and args[0] is not None:
-                verify_y_type(args[0])
+            if y is not None:
+                verify_y_type(y)
 
-                if not X.index.equals(args[0].index):
+                if not X.index.equals(y.index):
                     raise ValueError('Indexes do not match')
 
-            self._ibex_in_op = True
+            if isinstance(sample_weight, pd.Series) and not X.index.equals(sample_weight.index):
+                raise ValueError('Indexes do not match')
+
+            return _instrumentation.call(self, name, X, self.__call, fn, wrap_res, args, kwargs)
+
+        def __call(self, X, fn, wrap_res, args, kwargs):
+            X = self.__column_plan().take(X)
+
+            enter_op(self)
             try:
-                res = fn(self.__x(X), *args)
+                res = fn(self.__x(X), *args, **kwargs)
             finally:
-                delattr(self, '_ibex_in_op')
+                exit_op(self)
+
+            return self.__process_wrapped_call_res(X, res) if wrap_res else res
 
-            return self.__process_wrapped_call_res(X[self.x_columns], res)
+        def __column_plan(self):
+            x_columns = self.x_columns
+            plan = self.__dict__.get('_ibex_column_plan')
+            if plan is None or plan.columns is not x_columns:
+                plan = self._ibex_column_plan = _ColumnPlan(x_columns)
+            return plan
 
         # Tmp Ami - should be in base?
         def __x(self, X):
-            X = X[self.x_columns]
-            return X if isinstance(est, FrameMixin) else X.as_matrix()
+            return frame_to_array(X) if array_input else X
 
         def __process_wrapped_call_res(self, X, res):
-            if hasattr(self, '_ibex_in_op'):
+            if in_op(self):
                 return res
 
-            if isinstance(res, np.ndarray):
-                if len(res.shape) == 1:
-                    return pd.Series(res, index=X.index)
-
-                if len(res.shape) == 2:
-                    if len(X.columns) == res.shape[1]:
-                        columns = X.columns
-                    else:
-                        columns = [' ' for _ in range(res.shape[1])]
-                    return pd.DataFrame(res, index=X.index, columns=columns)
-
-            return res
+            return result_to_frame(res, X.index, X.columns)
 
         def __getattribute__(self, name):
             base_attr = super(_Adapter, self).__getattribute__(name)
@@ -160,7 +401,80 @@ def make_adapter(est):
             return base_attr
 
         def __reduce__(self):
-            return (_from_pickle, (est, self.get_params(deep=True), ))
+            state = dict(self.__dict__)
+            state.pop('_ibex_column_plan', None)
+            return (_from_pickle, (est, self.get_params(deep=False), state))
+
+    if methods is not None:
+        for name, method in methods.items():
+            setattr(_Adapter, name, method)
+
+    return _Adapter
+
+
+# Adapter classes, by adapted class. The values are weak, rather than the keys:
+# an adapter class subclasses (hence strongly references) its key.
+_adapters = weakref.WeakValueDictionary()
+_adapters_lock = threading.Lock()
+
+
+# The module generated by scripts/generate.py, if any; ``False`` until first looked up.
+_specialized = False
+
+
+def _specialized_methods(est):
+    """
+    Returns the specialized wrapped methods of ``est`` (see ``scripts/generate.py``), or ``None``
+    if there are none for it (or they were generated against a different version of :mod:`sklearn`).
+    """
+    global _specialized
+
+    if _specialized is False:
+        try:
+            from . import _specialized
+        except ImportError:
+            _specialized = None
+    if _specialized is None or _specialized.sklearn_version != sklearn.__version__:
+        return None
+
+    factory = _specialized.adapters.get(est.__module__ + '.' + est.__name__)
+    return factory(est) if factory is not None else None
+
+
+def _make_frame_class(est, specialize=True):
+    methods = _specialized_methods(est) if specialize else None
+    _Adapter = make_adapter(est, methods)
+
+    update_class_wrapper(_Adapter, est)
+
+    _Adapter.__name__ = est.__name__
+
+    for name, func in vars(_Adapter).items():
+        if name.startswith('_'):
+            continue
+
+        parfunc = getattr(est, name, None)
+        if parfunc and getattr(parfunc, '__doc__', None):
+            func.__doc__ = parfunc.__doc__
+
+    for wrap in _batched:
+        if not hasattr(est, wrap):
+            delattr(_Adapter, wrap + '_iter')
+
+    if not hasattr(est, 'predict'):
+        delattr(_Adapter, 'predict_record')
+        delattr(_Adapter, 'predict_records')
+
+    if methods is None:
+        for wrap in _wrapped:
+            if not hasattr(est, wrap) and hasattr(_Adapter, wrap):
+                delattr(_Adapter, wrap)
+    for wrap in _wrapped if methods is None else methods:
+        if hasattr(_Adapter, wrap) and six.callable(getattr(_Adapter, wrap)):
+            try:
+                update_method_wrapper(_Adapter, est, wrap)
+            except AttributeError:
+                pass
 
     return _Adapter
 
@@ -195,6 +509,13 @@ def frame(est):
 
         >>> PDLinearRegression(fit_intercept=False)
         Adapter[LinearRegression](copy_X=True, fit_intercept=False, n_jobs=1, normalize=False)
+
+        Each class is adapted once; further calls return the same adapter class:
+
+        >>> frame(linear_model.LinearRegression) is PDLinearRegression
+        True
+        >>> type(prd) is PDLinearRegression
+        True
     """
     from ._base import FrameMixin
 
@@ -211,54 +532,14 @@ def frame(est):
         f = frame(type(est))(**params)
         return f
 
-    _Adapter = make_adapter(est)
-
-    update_class_wrapper(_Adapter, est)
-
-    _Adapter.__name__ = est.__name__
-
-    for name, func in vars(_Adapter).items():
-        if name.startswith('_'):
-            continue
-
-        parfunc = getattr(est, name, None)
-        if parfunc and getattr(parfunc, '__doc__', None):
-            func.__doc__ = parfunc.__doc__
-
-    wrapped = [
-        'fit_transform',
-        'predict_proba',
-        'sample_y',
-        'score_samples',
-        'score',
-        'staged_predict_proba',
-        'apply',
-        'bic',
-        'perplexity',
-        'fit',
-        'decision_function',
-        'aic',
-        'partial_fit',
-        'predict',
-        'radius_neighbors',
-        'staged_decision_function',
-        'staged_predict',
-        'inverse_transform',
-        'fit_predict',
-        'kneighbors',
-        'predict_log_proba',
-        'transform',
-    ]
-    for wrap in wrapped:
-        if not hasattr(est, wrap) and hasattr(_Adapter, wrap):
-            delattr(_Adapter, wrap)
-        elif six.callable(getattr(_Adapter, wrap)):
-            try:
-                update_method_wrapper(_Adapter, est, wrap)
-            except AttributeError:
-                pass
+    with _adapters_lock:
+        try:
+            return _adapters[est]
+        except KeyError:
+            pass
 
-    return _Adapter
+        _Adapter = _adapters[est] = _make_frame_class(est)
+        return _Adapter
 
 
 __all__ += ['frame']
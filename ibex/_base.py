@@ -1,9 +1,12 @@
 from __future__ import absolute_import
 
 
+import traceback
 import collections
 import functools
 
+import six
+import numpy as np
 import pandas as pd
 from sklearn import base
 from sklearn import pipeline
@@ -11,6 +14,12 @@ from sklearn import exceptions
 from sklearn.externals import joblib
 
 from ._verify_args import verify_x_type, verify_y_type
+from ._conversion import frame_to_array, records_to_array, records_to_frame, conform_array, result_to_frame, _shares_memory
+from ._utils import batched_call
+from ._parallel import parallel_call
+from ._shared import shared_for_jobs, shared_many_for_jobs, attach
+from . import _cache
+from . import _instrumentation
 
 
 __all__ = []
@@ -137,6 +146,18 @@ class FrameMixin(object):
     def x_columns(self, columns):
         self.__cols = columns
 
+    def _ibex_required_columns(self, fitted):
+        """
+        Returns the columns this step reads from its input, or ``None`` if these are unknown (in
+        which case all columns are passed). If ``fitted``, the columns seen in ``fit`` can be used.
+        """
+        if not fitted:
+            return None
+        try:
+            return self.x_columns
+        except exceptions.NotFittedError:
+            return None
+
     def __or__(self, other):
         """
         Pipes the result of this step to other.
@@ -187,25 +208,259 @@ class FrameMixin(object):
 __all__ += ['FrameMixin']
 
 
-def _fit(transformer, X):
+def _required_columns(step, fitted=True):
+    """
+    Returns the columns ``step`` reads from its input (see :meth:`FrameMixin._ibex_required_columns`),
+    or ``None`` if these are unknown.
+    """
+    if not isinstance(step, FrameMixin):
+        return None
+    return step._ibex_required_columns(fitted)
+
+
+def _project(X, columns, projections=None):
+    """
+    Returns the columns of ``X`` which are in ``columns`` (in the order of ``X``), or ``X`` itself if
+    ``columns`` is ``None`` or contains all of them. Projections are memoized in ``projections``,
+    if given, by their columns.
+    """
+    if columns is None:
+        return X
+    wanted = set(columns)
+    keep = [c for c in X.columns if c in wanted]
+    if len(keep) == X.shape[1]:
+        return X
+    if projections is None:
+        return X[keep]
+    key = tuple(keep)
+    if key not in projections:
+        projections[key] = X[keep]
+    return projections[key]
+
+
+# In the functions below, a ``None`` transformer stands for the empty remainder of a branch
+# consisting entirely of a shared prefix (see :func:`_prefix_plan`); its result is its input.
+# A list of (named) steps stands for the fitted remainder of a branch following its shared
+# prefix; its result is that of applying the steps in turn.
+
+
+def _steps_transform(steps, X):
+    for _, step in steps:
+        X = step.transform(X)
+    return X
+
+
+def _steps_fit_transform(steps, X, y):
+    for _, step in steps:
+        if hasattr(step, 'fit_transform'):
+            X = step.fit_transform(X, y)
+        else:
+            X = step.fit(X, y).transform(X)
+    return X
+
+
+def _run(transformer, X):
+    if transformer is None:
+        return X
+    if isinstance(transformer, list):
+        return _steps_transform(transformer, X)
     return transformer.transform(X)
 
 
+def _fit(transformer, X):
+    return _run(transformer, attach(X))
+
+
+def _weigh(res, weight):
+    if weight is None:
+        return res
+
+    values = frame_to_array(res)
+    # Only an array allocated by the conversion is weighed in place: a result's own buffers may be
+    # shared with its input, or with anything else (e.g., a cache).
+    if not _shares_memory(values, res) and np.can_cast(np.result_type(values, weight), values.dtype):
+        values *= weight
+    else:
+        values = values * weight
+    return pd.DataFrame(values, index=res.index, columns=res.columns)
+
+
 def _transform(transformer, weight, X):
-    res = transformer.transform(X)
-    if weight is not None:
-        res *= weight
-    return res
+    if transformer is None:
+        return _weigh(attach(X), weight)
+    return _weigh(_run(transformer, attach(X)), weight)
 
 
 def _fit_transform(transformer, weight, X, y, **fit_params):
+    # The result is weighed by the caller, along with its assembly (see FeatureUnion._assemble).
+    X, y = attach(X), attach(y)
+    if transformer is None:
+        return X, None
     if hasattr(transformer, 'fit_transform'):
         res = transformer.fit_transform(X, y, **fit_params)
     else:
         res = transformer.fit(X, y, **fit_params).transform(X)
-    if weight is not None:
-        res *= weight
-    return res
+    return res, transformer
+
+
+def _fit_one(transformer, weight, X, y, **fit_params):
+    if transformer is not None:
+        transformer.fit(attach(X), attach(y), **fit_params)
+    return transformer
+
+
+def _branch_steps(transformer):
+    """
+    Returns the (named) steps of a transformer of a union: its steps, if it is a pipeline,
+    or the transformer itself otherwise.
+    """
+    if isinstance(transformer, Pipeline):
+        return list(transformer.steps)
+    return [(type(transformer).__name__.lower(), transformer)]
+
+
+def _params_equal(lhs, rhs):
+    if type(lhs) is not type(rhs):
+        return False
+    if isinstance(lhs, dict):
+        return sorted(lhs) == sorted(rhs) and all(_params_equal(lhs[k], rhs[k]) for k in lhs)
+    if isinstance(lhs, (list, tuple)):
+        return len(lhs) == len(rhs) and all(_params_equal(l, r) for l, r in zip(lhs, rhs))
+    if isinstance(lhs, np.ndarray):
+        return np.array_equal(lhs, rhs)
+    if isinstance(lhs, (pd.DataFrame, pd.Series, pd.Index)):
+        return lhs.equals(rhs)
+    try:
+        return bool(lhs == rhs)
+    except (TypeError, ValueError):
+        return lhs is rhs
+
+
+def _same_step(lhs, rhs):
+    """
+    Returns whether two steps would be fitted identically on the same input: whether they are
+    leaf estimators (their parameters contain no estimators) of the same class, with equal
+    parameters, and a fixed ``random_state`` (if any).
+    """
+    if type(lhs) is not type(rhs) or not isinstance(lhs, base.BaseEstimator):
+        return False
+    params = lhs.get_params(deep=False)
+    if any(isinstance(v, base.BaseEstimator) for v in params.values()):
+        return False
+    random_state = params.get('random_state', 0)
+    if isinstance(random_state, bool) or not isinstance(random_state, six.integer_types + (np.integer, )):
+        return False
+    return _params_equal(params, rhs.get_params(deep=False))
+
+
+def _prefix_plan(transformers):
+    """
+    Groups the transformers of a union by their common leading steps.
+
+    Returns:
+        A list of ``(prefix_length, indices)`` pairs, covering each transformer index exactly once,
+        where the transformers at ``indices`` share their first ``prefix_length`` steps (``0`` for a
+        transformer sharing none).
+    """
+    steps = [[step for _, step in _branch_steps(t)] for t in transformers]
+    plan, grouped = [], set()
+    for i in range(len(transformers)):
+        if i in grouped:
+            continue
+        group = [i] + [
+            j for j in range(i + 1, len(transformers))
+            if j not in grouped and _same_step(steps[i][0], steps[j][0])]
+        grouped.update(group)
+        if len(group) == 1:
+            plan.append((0, group))
+            continue
+        prefix_length = 1
+        while all(len(steps[j]) > prefix_length for j in group) and \
+                all(_same_step(steps[i][prefix_length], steps[j][prefix_length]) for j in group[1:]):
+            prefix_length += 1
+        plan.append((prefix_length, group))
+    return plan
+
+
+def _prefix_ids(transformers, plan):
+    if sorted(i for _, indices in plan for i in indices) != list(range(len(transformers))):
+        return None
+    return [
+        [id(step) for j in indices for _, step in _branch_steps(transformers[j])[: prefix_length]]
+        for prefix_length, indices in plan]
+
+
+def _guarded(fn, *args, **kwargs):
+    """
+    Calls ``fn``, returning a pair of its result and ``None``, or, if it raised, of ``None`` and
+    a pair of the exception and its formatted traceback.
+    """
+    try:
+        return fn(*args, **kwargs), None
+    except Exception as e:
+        return None, (e, traceback.format_exc())
+
+
+class FeatureUnionFitError(Exception):
+    """
+    Raised when fitting some of the transformers of a :class:`ibex.sklearn.pipeline.FeatureUnion` fails.
+    The other transformers are fitted regardless.
+
+    Attributes:
+
+        errors: A list of ``(name, exception, traceback)`` triplets, one per failed transformer,
+            where ``traceback`` is the formatted traceback of ``exception``.
+    """
+    def __init__(self, errors):
+        Exception.__init__(
+            self,
+            'Fitting failed for %s' % ', '.join('%s (%r)' % (name, e) for name, e, _ in errors))
+        self.errors = errors
+
+
+__all__ += ['FeatureUnionFitError']
+
+
+def _union_layout(Xts, weights=None):
+    """
+    Returns the widths of the results of the transformers, and their common dtype once weighed
+    by ``weights`` (if given; otherwise, the results are taken to be weighed already), if these
+    results can be written into a single preallocated array (``None`` otherwise).
+    """
+    dtypes = set()
+    for Xt, weight in zip(Xts, weights if weights is not None else [None] * len(Xts)):
+        if not isinstance(Xt, pd.DataFrame):
+            return None
+        for dtype in Xt.dtypes:
+            if weight is not None and isinstance(dtype, np.dtype):
+                dtype = np.result_type(np.empty(0, dtype=dtype), weight)
+            dtypes.add(dtype)
+    if len(dtypes) != 1:
+        return None
+    dtype = dtypes.pop()
+    if not isinstance(dtype, np.dtype) or dtype.kind not in 'biuf':
+        return None
+    return [Xt.shape[1] for Xt in Xts], dtype
+
+
+def _fits(Xt, X, width, dtype, weight):
+    if not isinstance(Xt, pd.DataFrame) or Xt.shape[1] != width or not Xt.index.equals(X.index):
+        return False
+    dtypes = set(Xt.dtypes)
+    if len(dtypes) > 1:
+        return False
+    if not dtypes:
+        return True
+    raw = dtypes.pop()
+    if not isinstance(raw, np.dtype):
+        return False
+    return (raw if weight is None else np.result_type(np.empty(0, dtype=raw), weight)) == dtype
+
+
+def _concat_columns(columns):
+    if not columns:
+        return pd.Index([])
+    return columns[0].append(columns[1:])
 
 
 # Tmp Ami - test weights weights
@@ -271,9 +526,17 @@ class FeatureUnion(base.BaseEstimator, base.TransformerMixin, FrameMixin):
             n_jobs,
             transformer_weights)
 
-    def fit(self, X, y=None):
+    @_instrumentation.instrumented
+    def fit(self, X, y=None, **fit_params):
         """
-        Fits the transformer using ``X`` (and possibly ``y``).
+        Fits the transformers using ``X`` (and possibly ``y``), in parallel if ``n_jobs`` is not 1.
+
+        Leading steps shared by several transformers (steps of the same class, with the same parameters)
+        are fitted once, and their output is passed on to the rest of each of these transformers.
+
+        The fitted transformers replace those in ``transformer_list`` (which matters with process-based
+        workers). If some transformers fail to fit, the others are still fitted, and a
+        :class:`ibex.FeatureUnionFitError` is raised at the end.
 
         Returns:
 
@@ -282,39 +545,172 @@ class FeatureUnion(base.BaseEstimator, base.TransformerMixin, FrameMixin):
         verify_x_type(X)
         verify_y_type(y)
 
-        self._feature_union.fit(X, y)
+        self._fit_branches(_fit_one, X, y, fit_params)
+        self.__dict__.pop('_ibex_layout', None)
 
         return self
 
     # Tmp Ami - get docstrings from sklearn.
+    @_instrumentation.instrumented
     def fit_transform(self, X, y=None, **fit_params):
         """
-        Fits the transformer using ``X`` (and possibly ``y``). Transforms
-        ``X`` using the transformers, uses :func:`pandas.concat`
-        to horizontally concatenate the results.
+        Fits the transformers using ``X`` (and possibly ``y``), as :meth:`fit` does, and horizontally
+        concatenates their results, as :meth:`transform` does.
 
         Returns:
 
-            ``self``
+            Transformed data.
         """
         verify_x_type(X)
         verify_y_type(y)
 
-        Xts = joblib.Parallel(n_jobs=self.n_jobs)(
-            joblib.delayed(_fit_transform)(trans, weight, X, y, **fit_params) for _, trans, weight in self._iter())
-        return pd.concat(Xts, axis=1)
+        Xts = [Xt for Xt, _ in self._fit_branches(_fit_transform, X, y, fit_params)]
+        weights = [weight for _, _, weight in self._iter()]
+        layout = self._ibex_layout = _union_layout(Xts, weights)
+        if layout:
+            return self._assemble(X, layout, zip(Xts, weights))
+        return pd.concat([_weigh(Xt, weight) for Xt, weight in zip(Xts, weights)], axis=1)
 
+    @_instrumentation.instrumented
     def transform(self, X):
         """
-        Transforms ``X`` using the transformers, uses :func:`pandas.concat`
-        to horizontally concatenate the results.
+        Transforms ``X`` using the transformers, and horizontally concatenates the results.
+
+        Leading steps shared by several transformers (see :meth:`fit`) transform ``X`` once.
+
+        If the (weighted) results of the transformers seen so far all shared a single numeric
+        dtype, the results are written, weighted, into consecutive column slices of a single
+        preallocated array. Otherwise, they are concatenated using :func:`pandas.concat`.
         """
         verify_x_type(X)
 
-        Xts = joblib.Parallel(n_jobs=self.n_jobs)(
-            joblib.delayed(_transform)(trans, weight, X) for _, trans, weight in self._iter())
+        tasks, _, _ = self._branch_tasks(X)
+
+        layout = self.__dict__.get('_ibex_layout', False)
+        if layout and len(layout[0]) == len(self.transformer_list):
+            if self.n_jobs == 1:
+                # Each result can be released as soon as it is written.
+                res = ((_fit(runner, X_in), weight) for runner, weight, X_in in tasks)
+            else:
+                with shared_many_for_jobs([X_in for _, _, X_in in tasks], self.n_jobs) as X_ins:
+                    Xts = joblib.Parallel(n_jobs=self.n_jobs)(
+                        joblib.delayed(_fit)(runner, X_in) for (runner, _, _), X_in in zip(tasks, X_ins))
+                res = zip(Xts, [weight for _, weight, _ in tasks])
+            return self._assemble(X, layout, res)
+
+        with shared_many_for_jobs([X_in for _, _, X_in in tasks], self.n_jobs) as X_ins:
+            Xts = joblib.Parallel(n_jobs=self.n_jobs)(
+                joblib.delayed(_transform)(runner, weight, X_in) for (runner, weight, _), X_in in zip(tasks, X_ins))
+        if layout is not None:
+            self._ibex_layout = _union_layout(Xts)
         return pd.concat(Xts, axis=1)
 
+    def _branch_tasks(self, X, y=None, fit=False, share=True):
+        """
+        Runs (fitting, if ``fit``) the leading steps shared by transformers (see :func:`_prefix_plan`).
+        When fitting, the fitted state of each shared step is copied to its counterparts in the other
+        transformers, and the grouping is kept for subsequent transforms.
+
+        Each transformer (or shared prefix) is given only the columns of ``X`` it reads, if these
+        are known (see :func:`_required_columns`).
+
+        Returns:
+            A triplet: a list of ``(runner, weight, input)`` triplets, one per transformer, where
+            ``runner`` is the transformer, or the rest of it following its shared steps (``None`` if
+            there is no such rest; a pipeline, when fitting, or a list of its fitted steps otherwise), and ``input`` is ``X``, or the output of the shared steps; a list of
+            the numbers of shared steps, per transformer; a ``dict`` mapping transformers whose shared
+            steps failed to fit, to the exception and formatted traceback.
+        """
+        transformers = [trans for _, trans in self.transformer_list]
+        singles = [(0, [i]) for i in range(len(transformers))]
+        if fit:
+            plan = _prefix_plan(transformers) if share else singles
+            self._ibex_prefix_plan = plan, _prefix_ids(transformers, plan)
+        else:
+            plan, ids = self.__dict__.get('_ibex_prefix_plan', (singles, None))
+            if ids is None or ids != _prefix_ids(transformers, plan):
+                plan = singles
+
+        tasks = [None] * len(transformers)
+        prefix_lengths = [0] * len(transformers)
+        errors = {}
+        projections = {}
+        for prefix_length, indices in plan:
+            if prefix_length == 0:
+                for i in indices:
+                    tasks[i] = (transformers[i], _project(X, _required_columns(transformers[i], not fit), projections))
+                continue
+
+            first_steps = _branch_steps(transformers[indices[0]])
+            prefix = first_steps[: prefix_length]
+            X_in = _project(X, _required_columns(prefix[0][1], not fit), projections)
+            if fit:
+                Xp, error = _guarded(_steps_fit_transform, prefix, X_in, y)
+            else:
+                Xp, error = _steps_transform(prefix, X_in), None
+            for j in indices:
+                steps = _branch_steps(transformers[j])
+                if error is not None:
+                    errors[j] = error
+                elif fit and j != indices[0]:
+                    for (_, step), (_, first_step) in zip(steps[: prefix_length], first_steps):
+                        step.__dict__.update(first_step.__dict__)
+                tail = steps[prefix_length:]
+                if not tail:
+                    tail = None
+                elif fit:
+                    tail = Pipeline(tail)
+                tasks[j] = (tail, Xp)
+                prefix_lengths[j] = prefix_length
+
+        weights = [weight for _, _, weight in self._iter()]
+        return [(runner, weight, X_in) for (runner, X_in), weight in zip(tasks, weights)], prefix_lengths, errors
+
+    def _fit_branches(self, fn, X, y, fit_params):
+        """
+        Fits the transformers by ``fn`` (either :func:`_fit_one` or :func:`_fit_transform`), in parallel,
+        and updates them (see :meth:`_update_transformers`). Returns the results of ``fn``.
+        """
+        # Fit parameters are routed to the transformers as wholes, so shared steps are only
+        # looked for without them.
+        tasks, prefix_lengths, errors = self._branch_tasks(X, y, fit=True, share=not fit_params)
+
+        pending = [i for i in range(len(tasks)) if i not in errors]
+        with shared_many_for_jobs([tasks[i][2] for i in pending] + [y], self.n_jobs) as X_ins:
+            y_ = X_ins.pop()
+            outs = joblib.Parallel(n_jobs=self.n_jobs)(
+                joblib.delayed(_guarded)(fn, tasks[i][0], tasks[i][1], X_in, y_, **fit_params)
+                for i, X_in in zip(pending, X_ins))
+
+        outcomes = [(None, errors.get(i)) for i in range(len(tasks))]
+        for i, out in zip(pending, outs):
+            outcomes[i] = out
+        fitted = (lambda res: res) if fn is _fit_one else (lambda res: res[1])
+        return self._update_transformers(outcomes, fitted, prefix_lengths)
+
+    def _assemble(self, X, layout, res):
+        widths, dtype = layout
+        out = np.empty((len(X), sum(widths)), dtype=dtype)
+        columns, start = [], 0
+        res = iter(res)
+        for width, (Xt, weight) in zip(widths, res):
+            if not _fits(Xt, X, width, dtype, weight):
+                # The results no longer match those seen so far.
+                Xts = [pd.DataFrame(out[:, : start], index=X.index, columns=_concat_columns(columns))]
+                Xts.append(_weigh(Xt, weight))
+                Xts.extend(_weigh(Xt, weight) for Xt, weight in res)
+                self._ibex_layout = None
+                return pd.concat(Xts, axis=1)
+
+            if weight is None:
+                out[:, start: start + width] = frame_to_array(Xt)
+            else:
+                np.multiply(frame_to_array(Xt), weight, out=out[:, start: start + width], casting='unsafe')
+            columns.append(Xt.columns)
+            start += width
+
+        return pd.DataFrame(out, index=X.index, columns=_concat_columns(columns))
+
     def get_feature_names(self):
         return self._feature_union.get_feature_names()
 
@@ -333,6 +729,36 @@ class FeatureUnion(base.BaseEstimator, base.TransformerMixin, FrameMixin):
     def n_jobs(self):
         return self._feature_union.n_jobs
 
+    def _update_transformers(self, outs, fitted, prefix_lengths):
+        """
+        Replaces the transformers by the fitted ones, given the outcomes (see :func:`_guarded`)
+        of the branches, the function extracting a fitted runner (see :meth:`_branch_tasks`) from
+        a result, and the numbers of shared steps preceding the runners.
+        Raises :class:`FeatureUnionFitError` if any branch failed; returns the results otherwise.
+        """
+        errors = []
+        transformer_list = []
+        for (name, trans), (res, error), prefix_length in zip(self.transformer_list, outs, prefix_lengths):
+            if error is not None:
+                errors.append((name, ) + error)
+            elif prefix_length == 0:
+                trans = fitted(res)
+            elif fitted(res) is not None:
+                trans.steps[prefix_length:] = fitted(res).steps
+            transformer_list.append((name, trans))
+        self._feature_union.transformer_list[:] = transformer_list
+
+        if errors:
+            raise FeatureUnionFitError(errors)
+
+        return [res for res, _ in outs]
+
+    def _ibex_required_columns(self, fitted):
+        required = [_required_columns(trans, fitted) for _, trans in self.transformer_list]
+        if not required or any(columns is None for columns in required):
+            return None
+        return list(collections.OrderedDict.fromkeys(c for columns in required for c in columns))
+
     def _iter(self):
         weights = self._feature_union.transformer_weights
         if weights is None:
@@ -355,15 +781,65 @@ for wrap in _wrapped:
         pass
 
 
+def _array_step(step):
+    return getattr(step, '_ibex_array_input', False) and hasattr(step, '_ibex_array_call')
+
+
+def _step_call(step, name, X, columns, index, elide, *args, **kwargs):
+    """
+    Calls method ``name`` of a pipeline step on ``X``: either a frame, or, if ``columns`` is not ``None``,
+    a raw array standing for a frame with ``columns`` and ``index`` (see :meth:`Pipeline._elisions`).
+
+    Returns:
+        A triplet of the result, which is a raw array only if ``elide``, its columns if so (``None``
+        otherwise), and its index.
+    """
+    if name == 'fit_transform' and not hasattr(step, 'fit_transform'):
+        _step_call(step, 'fit', X, columns, index, False, *args, **kwargs)
+        return _step_call(step, 'transform', X, columns, index, elide)
+
+    if columns is None and not elide:
+        res = getattr(step, name)(X, *args, **kwargs)
+        return res, None, getattr(res, 'index', index)
+
+    if columns is None:
+        index = X.index
+    res, res_columns = step._ibex_array_call(name, X, columns, *args, **kwargs)
+    if elide and isinstance(res, np.ndarray) and res_columns is not None:
+        return conform_array(res), res_columns, index
+    return result_to_frame(res, index, res_columns), None, index
+
+
 class Pipeline(base.BaseEstimator, FrameMixin):
+    """
+    A pipeline of steps, as :class:`sklearn.pipeline.Pipeline`.
 
+    Arguments (beyond those of :class:`sklearn.pipeline.Pipeline`):
+
+        cache: If not ``None``, a :class:`ibex.ResultCache`, a :class:`ibex.MemoryCache`, or the
+            directory of a :class:`ibex.ResultCache`.
+            Fitting then stores each fitted transformer step, along with its output, in the cache,
+            keyed by a fingerprint of the pipeline's input (see :func:`ibex.frame_fingerprint`),
+            and the classes and parameters of the step and of those preceding it. A later fit
+            finding a step in the cache uses the stored one instead of fitting it (e.g., when
+            a grid search varies only the parameters of the final estimator).
+            Steps passed fit parameters are not cached.
+
+    Consecutive steps adapting estimators which operate on arrays (see :func:`ibex.frame`) pass their
+    outputs to each other as arrays; frames are built only where a step, or the caller, needs one.
+    """
     def __init__(self, steps, *args, **kwargs):
+        self.cache = kwargs.pop('cache', None)
         self._pipeline = pipeline.Pipeline(steps, *args, **kwargs)
 
     def get_params(self, deep=True):
-        return self._pipeline.get_params(deep)
+        params = self._pipeline.get_params(deep)
+        params['cache'] = self.cache
+        return params
 
     def set_params(self, **kwargs):
+        if 'cache' in kwargs:
+            self.cache = kwargs.pop('cache')
         self._pipeline.set_params(**kwargs)
         return self
 
@@ -375,48 +851,250 @@ class Pipeline(base.BaseEstimator, FrameMixin):
     def steps(self):
         return self._pipeline.steps
 
+    @_instrumentation.instrumented
     def fit(self, X, y=None, **fit_params):
-        self._pipeline.fit(X, y, **fit_params)
+        self._fit_call('fit', self._project(X, False), y, fit_params)
         return self
 
+    @_instrumentation.instrumented
     def fit_transform(self, X, y=None, **fit_params):
-        return self._pipeline.fit_transform(X, y, **fit_params)
+        return self._fit_call('fit_transform', self._project(X, False), y, fit_params)
+
+    def _fit_call(self, name, X, y, fit_params):
+        """
+        Fits the pipeline, returning the result of method ``name`` (``'fit'``, ``'fit_transform'``,
+        or ``'fit_predict'``) of the final step.
+        """
+        if self.cache is not None:
+            Xt, final_params = self._cached_fit_transformers(X, y, fit_params)
+            final = self.steps[-1][1]
+            if final is None:
+                return Xt
+            return _step_call(final, name, Xt, None, None, False, y, **final_params)[0]
+
+        elisions = self._elisions()
+        if not any(elisions) or getattr(self._pipeline, 'memory', None) is not None:
+            return getattr(self._pipeline, name)(X, y, **fit_params)
+
+        if y is not None and isinstance(X, pd.DataFrame):
+            verify_y_type(y)
+            if not X.index.equals(y.index):
+                raise ValueError('Indexes do not match')
+
+        step_params = self._step_fit_params(fit_params)
+        steps = self.steps
+        Xt, columns, index = X, None, getattr(X, 'index', None)
+        for i, ((step_name, step), elide) in enumerate(zip(steps, elisions)):
+            if step is None:
+                continue
+            method = name if i == len(steps) - 1 else 'fit_transform'
+            Xt, columns, index = _step_call(step, method, Xt, columns, index, elide, y, **step_params[step_name])
+        return Xt
+
+    def _call(self, name, X, *args):
+        """
+        Applies the transforms of the pipeline, then method ``name`` of the final step.
+        """
+        elisions = self._elisions()
+        if not any(elisions):
+            return getattr(self._pipeline, name)(X, *args)
+
+        steps = self.steps
+        Xt, columns, index = X, None, getattr(X, 'index', None)
+        for i, ((_, step), elide) in enumerate(zip(steps, elisions)):
+            if step is None:
+                continue
+            if i == len(steps) - 1:
+                Xt, columns, index = _step_call(step, name, Xt, columns, index, elide, *args)
+            else:
+                Xt, columns, index = _step_call(step, 'transform', Xt, columns, index, elide)
+        return Xt
+
+    def _elisions(self):
+        """
+        Returns, per step, whether it passes its output to the next step as a raw array, rather than
+        as a frame: the case for consecutive adapters of estimators operating on arrays.
+        """
+        steps = [step for _, step in self.steps]
+        array_steps = [_array_step(step) for step in steps]
+        return [s and t for s, t in zip(array_steps[: -1], array_steps[1:])] + [False]
+
+    def _step_fit_params(self, fit_params):
+        step_params = dict((name, {}) for name, _ in self.steps)
+        for k, v in six.iteritems(fit_params):
+            name, param = k.split('__', 1)
+            step_params[name][param] = v
+        return step_params
+
+    def _cached_fit_transformers(self, X, y, fit_params):
+        """
+        Fits the steps preceding the final one, through the cache (see :class:`Pipeline`), replacing
+        each step found in it by the stored one.
+
+        Returns:
+            A pair of the output of the last of these steps, and the fit parameters of the final step.
+        """
+        cache = _cache.as_cache(self.cache)
+
+        step_params = self._step_fit_params(fit_params)
+
+        key = _cache.data_key(X, y)
+        steps = self._pipeline.steps
+        Xt = X
+        for i, (name, step) in enumerate(steps[: -1]):
+            if step is None:
+                continue
+            key = _cache.step_key(key, step) if not step_params[name] else None
+            stored = cache.get(key) if key is not None else None
+            if stored is not None:
+                step, Xt = stored
+                steps[i] = (name, step)
+                continue
+            if hasattr(step, 'fit_transform'):
+                Xt = step.fit_transform(Xt, y, **step_params[name])
+            else:
+                Xt = step.fit(Xt, y, **step_params[name]).transform(Xt)
+            cache.put(key, (step, Xt))
+        return Xt, step_params[steps[-1][0]]
+
+    def _project(self, X, fitted=True):
+        """
+        Drops the columns of ``X`` which the first step does not read (see :func:`_required_columns`).
+        """
+        if not isinstance(X, pd.DataFrame):
+            return X
+        return _project(X, self._ibex_required_columns(fitted))
+
+    def _ibex_required_columns(self, fitted):
+        if not self.steps:
+            return None
+        return _required_columns(self.steps[0][1], fitted)
 
     # Tmp Ami
     # @if_delegate_has_method(delegate='_final_estimator')
-    def predict(self, X):
-        return self._pipeline.predict(X)
+    @_instrumentation.instrumented
+    def predict(self, X, batch_size=None, n_jobs=None, backend='threading'):
+        """
+        Applies the transforms of the pipeline, then ``predict`` of the final estimator.
+
+        Arguments:
+
+            X: :class:`pandas.DataFrame` of the data to predict.
+
+            batch_size: If not ``None``, the maximal number of rows passed through
+                the pipeline at a time.
+
+            n_jobs: If not ``None``, the number of workers between which to split the rows of ``X``.
+
+            backend: Either ``'threading'`` or ``'multiprocessing'``; the type of the workers.
+        """
+        if n_jobs is not None and n_jobs != 1:
+            return parallel_call(self, 'predict', self._project(X), n_jobs, backend, batch_size=batch_size)
+        return batched_call(functools.partial(self._call, 'predict'), self._project(X), batch_size)
 
     # Tmp Ami
     # @if_delegate_has_method(delegate='_final_estimator')
+    @_instrumentation.instrumented
     def fit_predict(self, X, y=None, **fit_params):
-        return self._pipeline.fit_predict(X, y, **fit_params)
+        return self._fit_call('fit_predict', self._project(X, False), y, fit_params)
 
     # Tmp Ami
     # @if_delegate_has_method(delegate='_final_estimator')
-    def predict_proba(self, X):
-        return self._pipeline.predict_proba(X)
+    @_instrumentation.instrumented
+    def predict_proba(self, X, batch_size=None, n_jobs=None, backend='threading'):
+        if n_jobs is not None and n_jobs != 1:
+            return parallel_call(self, 'predict_proba', self._project(X), n_jobs, backend, batch_size=batch_size)
+        return batched_call(functools.partial(self._call, 'predict_proba'), self._project(X), batch_size)
 
     # Tmp Ami
     # @if_delegate_has_method(delegate='_final_estimator')
-    def decision_function(self, X):
-        return self._pipeline.decision_function(X)
+    @_instrumentation.instrumented
+    def decision_function(self, X, batch_size=None, n_jobs=None, backend='threading'):
+        if n_jobs is not None and n_jobs != 1:
+            return parallel_call(self, 'decision_function', self._project(X), n_jobs, backend, batch_size=batch_size)
+        return batched_call(functools.partial(self._call, 'decision_function'), self._project(X), batch_size)
 
     # Tmp Ami
     # @if_delegate_has_method(delegate='_final_estimator')
+    @_instrumentation.instrumented
     def predict_log_proba(self, X):
-        return self._pipeline.predict_log_proba(X)
+        return self._call('predict_log_proba', self._project(X))
 
-    def transform(self, X):
-        return self._pipeline.transform(X)
+    @_instrumentation.instrumented
+    def transform(self, X, batch_size=None, n_jobs=None, backend='threading'):
+        if n_jobs is not None and n_jobs != 1:
+            return parallel_call(self, 'transform', self._project(X), n_jobs, backend, batch_size=batch_size)
+        return batched_call(functools.partial(self._call, 'transform'), self._project(X), batch_size)
+
+    def predict_record(self, record):
+        """
+        Predicts a single record, bypassing the construction of :mod:`pandas` objects
+        where all the steps allow it.
+
+        Arguments:
+
+            record: A mapping (e.g., a ``dict``) from each column seen in ``fit``, to its value.
+
+        Returns:
+
+            The prediction, as a plain Python scalar (or a ``list``, for multi-output estimators).
+        """
+        return self.predict_records([record])[0]
+
+    def predict_records(self, records):
+        """
+        Predicts a sequence of records, bypassing the construction of :mod:`pandas` objects
+        where all the steps allow it.
+
+        Arguments:
+
+            records: An iterable of mappings (e.g., ``dict`` objects) from each column seen in ``fit``,
+                to its value.
+
+        Returns:
+
+            A ``list`` of the predictions, as plain Python objects.
+        """
+        records = list(records)
+        steps = [step for _, step in self.steps]
+        x_columns = steps[0].x_columns
+
+        if not all(getattr(step, '_ibex_array_input', False) for step in steps):
+            return self.predict(records_to_frame(records, x_columns)).values.tolist()
+
+        Xt = records_to_array(records, x_columns)
+        for step in steps[:-1]:
+            Xt = step._ibex_raw_call('transform', Xt)
+        return steps[-1]._ibex_raw_call('predict', Xt).tolist()
+
+    def predict_iter(self, Xs):
+        """
+        Lazily predicts each of an iterable of :class:`pandas.DataFrame` objects (e.g., the chunks
+        read by :func:`pandas.read_csv` with ``chunksize``), yielding the results in order.
+        """
+        for X in Xs:
+            yield self.predict(X)
+
+    def predict_proba_iter(self, Xs):
+        for X in Xs:
+            yield self.predict_proba(X)
+
+    def decision_function_iter(self, Xs):
+        for X in Xs:
+            yield self.decision_function(X)
+
+    def transform_iter(self, Xs):
+        for X in Xs:
+            yield self.transform(X)
 
     def inverse_transform(self, X):
         return self._pipeline.inverse_transform(X)
 
     # Tmp Ami
     # @if_delegate_has_method(delegate='_final_estimator')
+    @_instrumentation.instrumented
     def score(self, X, y=None):
-        return self._pipeline.score(X, y)
+        return self._call('score', self._project(X), y)
 
     @property
     def classes_(self):
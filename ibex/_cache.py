@@ -0,0 +1,426 @@
+from __future__ import absolute_import
+
+
+import os
+import sys
+import copy
+import hashlib
+import tempfile
+import threading
+import collections
+
+import six
+import numpy as np
+import pandas as pd
+from sklearn import base
+from sklearn.externals import joblib
+
+
+__all__ = []
+
+
+_missing = object()
+
+
+def frame_fingerprint(X):
+    """
+    Returns a hex digest of the content of ``X``.
+
+    For a :class:`pandas.DataFrame` or :class:`pandas.Series`, this covers the values, the index,
+    the columns (or name) and the dtypes, so equal digests indicate equal frames (up to
+    hash collisions). Other objects are hashed by :func:`sklearn.externals.joblib.hash`.
+
+    Example:
+
+        >>> import pandas as pd
+        >>> from ibex import frame_fingerprint
+        >>>
+        >>> X = pd.DataFrame({'a': [1, 2, 3], 'b': [3, 2, 0]})
+        >>> frame_fingerprint(X) == frame_fingerprint(X.copy())
+        True
+        >>> frame_fingerprint(X) == frame_fingerprint(X.rename(columns={'b': 'c'}))
+        False
+        >>> frame_fingerprint(X) == frame_fingerprint(X.set_index('a'))
+        False
+    """
+    if not isinstance(X, (pd.DataFrame, pd.Series)):
+        return joblib.hash(X)
+
+    h = hashlib.sha1()
+    h.update(type(X).__name__.encode('utf-8'))
+    if isinstance(X, pd.DataFrame):
+        h.update(repr(list(X.columns)).encode('utf-8'))
+        h.update(repr([str(dtype) for dtype in X.dtypes]).encode('utf-8'))
+    else:
+        h.update(repr(X.name).encode('utf-8'))
+        h.update(str(X.dtype).encode('utf-8'))
+    h.update(repr(list(X.index.names)).encode('utf-8'))
+    h.update(str(X.shape).encode('utf-8'))
+    h.update(np.ascontiguousarray(pd.util.hash_pandas_object(X, index=True).values).data)
+    return h.hexdigest()
+
+__all__ += ['frame_fingerprint']
+
+
+def _class_name(cls):
+    # Adapted classes are created dynamically (and share a module), so they are named after the classes
+    # they adapt, rather than pickled.
+    if '_ibex_signatures' in vars(cls):
+        return 'frame(%s)' % _class_name(cls.__bases__[0])
+    if '_ibex_data' in vars(cls):
+        return 'xy(%s)' % _class_name(cls.__bases__[0])
+    return cls.__module__ + '.' + getattr(cls, '__qualname__', cls.__name__)
+
+
+def _params_fingerprint(est):
+    """
+    Returns a hex digest of the class and (deep) parameters of ``est``, or ``None`` if these cannot
+    be hashed (e.g., a parameter is a lambda).
+    """
+    params = est.get_params(deep=True) if hasattr(est, 'get_params') else {}
+    # Nested estimators are represented by their classes; their parameters are part of params.
+    params = dict(
+        (k, _class_name(type(v)) if isinstance(v, base.BaseEstimator) else v)
+        for k, v in six.iteritems(params))
+    try:
+        return joblib.hash((_class_name(type(est)), sorted(six.iteritems(params), key=lambda kv: kv[0])))
+    except Exception:
+        return None
+
+
+def callable_key(func):
+    """
+    Returns a hex digest identifying the callable ``func``, or ``None`` if it cannot be identified.
+
+    Functions are identified by their qualified names, code, defaults, and closures (so that the
+    digest changes along with the code, and differs between lambdas), other callables (e.g.,
+    :class:`numpy.ufunc` objects) by :func:`sklearn.externals.joblib.hash`.
+    """
+    code = getattr(func, '__code__', None)
+    try:
+        if code is None:
+            return joblib.hash(func)
+        closure = [c.cell_contents for c in (getattr(func, '__closure__', None) or ())]
+        return joblib.hash((
+            getattr(func, '__module__', None),
+            getattr(func, '__qualname__', getattr(func, '__name__', None)),
+            code.co_code,
+            [c for c in code.co_consts if not hasattr(c, 'co_code')],
+            code.co_names,
+            getattr(func, '__defaults__', None),
+            closure))
+    except Exception:
+        return None
+
+
+def data_key(X, y=None):
+    """
+    Returns the key of fitting on ``X`` and ``y`` (see :func:`frame_fingerprint`).
+    """
+    y_key = frame_fingerprint(y) if y is not None else ''
+    return hashlib.sha1((frame_fingerprint(X) + y_key).encode('utf-8')).hexdigest()
+
+
+def step_key(base_key, est):
+    """
+    Returns the key of fitting ``est`` on the data identified by ``base_key`` (a fingerprint of the
+    data, or the key of the preceding step), or ``None`` if ``est`` cannot be keyed.
+    """
+    if base_key is None:
+        return None
+    params = _params_fingerprint(est)
+    if params is None:
+        return None
+    return hashlib.sha1((base_key + params).encode('utf-8')).hexdigest()
+
+
+def _nbytes(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sys.getsizeof(value) + sum(_nbytes(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class MemoryCache(object):
+    """
+    A size-bounded in-memory cache of results, evicting the least recently used entries.
+
+    Values are copied on insertion and on retrieval (by :func:`copy.deepcopy`), so neither the
+    caller storing a value nor those retrieving it can modify the stored one. Their sizes are
+    estimated from their arrays' buffers.
+
+    Arguments:
+
+        max_bytes: The maximal total size of the entries. Following each insertion,
+            the least recently used entries are removed until the total is within this size.
+
+    Example:
+
+        >>> from ibex import MemoryCache
+        >>>
+        >>> cache = MemoryCache(max_bytes=10 ** 6)
+        >>> cache.put('k', [1, 2, 3])
+        >>> cache.get('k'), cache.get('j')
+        ([1, 2, 3], None)
+        >>> sorted(cache.stats().items())
+        [('bytes', ...), ('entries', 1), ('evictions', 0), ('hits', 1), ('misses', 1)]
+    """
+    def __init__(self, max_bytes=2 ** 28):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        self._bytes = 0
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    # The entries are not pickled: a cache in a different process starts out empty.
+    def __reduce__(self):
+        return MemoryCache, (self.max_bytes, )
+
+    # The cache is a shared resource, so cloning an estimator using it should not copy it.
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def get(self, key, default=None):
+        """
+        Returns the value stored under ``key``, or ``default`` if there is none.
+        """
+        with self._lock:
+            if key is None or key not in self._entries:
+                self._stats['misses'] += 1
+                return default
+            # Most recently used last.
+            entry = self._entries[key] = self._entries.pop(key)
+            self._stats['hits'] += 1
+        return copy.deepcopy(entry[0])
+
+    def put(self, key, value):
+        """
+        Stores ``value`` under ``key``, then evicts entries as needed.
+        """
+        if key is None:
+            return
+        value = copy.deepcopy(value)
+        size = _nbytes(value)
+        with self._lock:
+            self._bytes -= self._entries.pop(key, (None, 0))[1]
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, old_size) = self._entries.popitem(last=False)
+                self._bytes -= old_size
+                self._stats['evictions'] += 1
+
+    def stats(self):
+        """
+        Returns a ``dict`` of the numbers of hits, misses, and evictions so far, and of the
+        number and total (estimated) size of the current entries.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+            return stats
+
+    def clear(self):
+        """
+        Removes all entries, and resets the statistics.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            for k in self._stats:
+                self._stats[k] = 0
+
+__all__ += ['MemoryCache']
+
+
+class ResultCache(object):
+    """
+    A size-bounded on-disk cache of results (e.g., fitted pipeline steps and their outputs),
+    evicting the least recently used entries.
+
+    Arguments:
+
+        directory: The directory holding the entries (created if needed). If ``None``, a new
+            temporary directory is used. Entries already in the directory are reused.
+
+        max_bytes: The maximal total size of the entries' files. Following each insertion,
+            the least recently used entries are removed until the total is within this size.
+
+        memory_bytes: If positive, the size of an in-memory tier (see :class:`MemoryCache`) in front
+            of the files, holding the most recently used entries. Its statistics are under
+            ``'memory'`` in :meth:`stats`.
+
+    Example:
+
+        >>> import tempfile
+        >>> from ibex import ResultCache
+        >>>
+        >>> cache = ResultCache(tempfile.mkdtemp(), max_bytes=10 ** 6)
+        >>> cache.get('k') is None
+        True
+        >>> cache.put('k', ('fitted', [1, 2, 3]))
+        >>> cache.get('k')
+        ('fitted', [1, 2, 3])
+        >>> sorted(cache.stats().items())
+        [('bytes', ...), ('entries', 1), ('evictions', 0), ('hits', 1), ('misses', 1)]
+    """
+    def __init__(self, directory=None, max_bytes=2 ** 30, memory_bytes=0):
+        self.directory = directory if directory is not None else tempfile.mkdtemp(prefix='ibex-cache-')
+        self.max_bytes = max_bytes
+        self.memory_bytes = memory_bytes
+        self._memory = MemoryCache(memory_bytes) if memory_bytes > 0 else None
+        self._lock = threading.Lock()
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._load()
+
+    def __reduce__(self):
+        return ResultCache, (self.directory, self.max_bytes, self.memory_bytes)
+
+    # The cache is a shared resource, so cloning an estimator using it should not copy it.
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def _load(self):
+        if not os.path.isdir(self.directory):
+            os.makedirs(self.directory)
+        entries = []
+        for file_name in os.listdir(self.directory):
+            if not file_name.endswith('.pkl'):
+                continue
+            stat = os.stat(os.path.join(self.directory, file_name))
+            entries.append((stat.st_mtime, file_name[: -len('.pkl')], stat.st_size))
+        # Least recently used first.
+        self._entries = collections.OrderedDict((key, size) for _, key, size in sorted(entries))
+        self._bytes = sum(self._entries.values())
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + '.pkl')
+
+    def get(self, key, default=None):
+        """
+        Returns the value stored under ``key``, or ``default`` if there is none.
+        """
+        if self._memory is not None and key is not None:
+            value = self._memory.get(key, _missing)
+            if value is not _missing:
+                with self._lock:
+                    if key in self._entries:
+                        self._entries[key] = self._entries.pop(key)
+                    self._stats['hits'] += 1
+                return value
+
+        with self._lock:
+            if key is None or key not in self._entries:
+                self._stats['misses'] += 1
+                return default
+            try:
+                value = joblib.load(self._path(key))
+            except (IOError, OSError, EOFError):
+                # Removed (e.g., by a different cache over the same directory).
+                self._bytes -= self._entries.pop(key)
+                self._stats['misses'] += 1
+                return default
+            # Most recently used last.
+            self._entries[key] = self._entries.pop(key)
+            try:
+                os.utime(self._path(key), None)
+            except OSError:
+                pass
+            self._stats['hits'] += 1
+        if self._memory is not None:
+            self._memory.put(key, value)
+        return value
+
+    def put(self, key, value):
+        """
+        Stores ``value`` under ``key``, then evicts entries as needed.
+        """
+        if key is None:
+            return
+        if self._memory is not None:
+            self._memory.put(key, value)
+        path = self._path(key)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(fd)
+        try:
+            joblib.dump(value, tmp_path)
+            os.rename(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        size = os.path.getsize(path)
+
+        with self._lock:
+            self._bytes -= self._entries.pop(key, 0)
+            self._entries[key] = size
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                old_key, old_size = self._entries.popitem(last=False)
+                self._bytes -= old_size
+                self._stats['evictions'] += 1
+                try:
+                    os.remove(self._path(old_key))
+                except OSError:
+                    pass
+
+    def stats(self):
+        """
+        Returns a ``dict`` of the numbers of hits, misses, and evictions so far, and of the
+        number and total size of the current entries.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+            stats['entries'] = len(self._entries)
+            stats['bytes'] = self._bytes
+        if self._memory is not None:
+            stats['memory'] = self._memory.stats()
+        return stats
+
+    def clear(self):
+        """
+        Removes all entries, and resets the statistics.
+        """
+        if self._memory is not None:
+            self._memory.clear()
+        with self._lock:
+            for key in self._entries:
+                try:
+                    os.remove(self._path(key))
+                except OSError:
+                    pass
+            self._entries.clear()
+            self._bytes = 0
+            for k in self._stats:
+                self._stats[k] = 0
+
+__all__ += ['ResultCache']
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def as_cache(cache):
+    """
+    Returns ``cache`` if it is ``None``, a :class:`ResultCache`, or a :class:`MemoryCache`, and the
+    (single, per process) :class:`ResultCache` over the directory ``cache`` otherwise.
+    """
+    if cache is None or isinstance(cache, (ResultCache, MemoryCache)):
+        return cache
+    with _caches_lock:
+        if cache not in _caches:
+            _caches[cache] = ResultCache(cache)
+        return _caches[cache]
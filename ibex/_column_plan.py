@@ -0,0 +1,65 @@
+from __future__ import absolute_import
+
+
+__all__ = []
+
+
+_by_label = object()
+
+
+class _ColumnPlan(object):
+    """
+    Selects, in fit order, the columns seen at fit time.
+
+    The plan is compiled once per fit. Each distinct columns index passed
+    to :meth:`take` is resolved once to either:
+
+        * the identity, if it already holds the fitted columns in the fitted
+            order, in which case the frame is handed over as is, or
+
+        * a positional indexer, taken in a single :attr:`pandas.DataFrame.iloc`
+            call.
+
+    Arguments:
+
+        columns: The :class:`pandas.Index` of columns seen at fit time.
+    """
+    def __init__(self, columns):
+        self.columns = columns
+        # Only the last seen columns index is cached; an index is immutable,
+        # so its identity is a sufficient schema fingerprint.
+        self._last = (columns, None)
+
+    def take(self, X):
+        """
+        Returns:
+
+            ``X`` restricted to, and ordered by, the fitted columns.
+
+        Raises:
+
+            ``KeyError`` if some fitted column is missing from ``X``.
+        """
+        columns, indexer = self._last
+        if X.columns is not columns:
+            columns, indexer = X.columns, self._compile(X.columns)
+            self._last = (columns, indexer)
+
+        if indexer is None:
+            return X
+        if indexer is _by_label:
+            return X[self.columns]
+        return X.iloc[:, indexer]
+
+    def _compile(self, columns):
+        if columns.equals(self.columns):
+            return None
+
+        if not columns.is_unique or not self.columns.is_unique:
+            return _by_label
+
+        indexer = columns.get_indexer(self.columns)
+        if (indexer == -1).any():
+            raise KeyError('%s not in index' % list(self.columns[indexer == -1]))
+        return indexer
+
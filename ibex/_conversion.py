@@ -0,0 +1,322 @@
+from __future__ import absolute_import
+
+
+import threading
+import contextlib
+
+import six
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+
+__all__ = []
+
+
+_policy = {'dtype': None, 'sparse_format': 'csr'}
+
+# The legacy sparse frame class, used only where the ``sparse`` accessor is missing (later versions
+# of pandas keep a stub of the class, which cannot be constructed).
+_SparseDataFrame = None if hasattr(pd.DataFrame, 'sparse') else getattr(pd, 'SparseDataFrame', None)
+
+_stats_lock = threading.Lock()
+_stats = {'conversions': 0, 'copies': 0, 'copied_bytes': 0}
+
+
+def set_dtype_policy(policy):
+    """
+    Sets the policy by which :class:`pandas.DataFrame` objects are converted
+    to :class:`numpy.ndarray` objects, before being passed to non-``pandas``
+    estimators.
+
+    Arguments:
+
+        policy: One of:
+
+            * ``None``, meaning that the conversion is that of :attr:`pandas.DataFrame.values` (the default)
+
+            * ``'homogeneous'``, meaning that the dtype of a frame whose columns all share a
+                dtype is preserved, and that other frames are converted to ``float64``
+
+            * a :class:`numpy.dtype` (or anything convertible to one, e.g., ``'float32'``), to which all frames are converted
+
+    Returns:
+
+        The previous policy.
+
+    Example:
+
+        >>> import ibex
+        >>> ibex.set_dtype_policy('float32')
+        >>> ibex.set_dtype_policy(None)
+        dtype('float32')
+    """
+    if policy is not None and policy != 'homogeneous':
+        policy = np.dtype(policy)
+
+    prev, _policy['dtype'] = _policy['dtype'], policy
+    return prev
+
+__all__ += ['set_dtype_policy']
+
+
+@contextlib.contextmanager
+def dtype_policy(policy):
+    """
+    Context manager temporarily setting the conversion policy (see :func:`ibex.set_dtype_policy`).
+
+    Example:
+
+        >>> import numpy as np
+        >>> import pandas as pd
+        >>> import ibex
+        >>> from ibex.sklearn import preprocessing as pd_preprocessing
+        >>>
+        >>> X = pd.DataFrame({'a': [1., 2., 3.], 'b': [3., 4., 5.]})
+        >>> with ibex.dtype_policy(np.float32):
+        ...     pd_preprocessing.StandardScaler().fit_transform(X).dtypes
+        a    float32
+        b    float32
+        dtype: object
+    """
+    prev = set_dtype_policy(policy)
+    try:
+        yield
+    finally:
+        _policy['dtype'] = prev
+
+__all__ += ['dtype_policy']
+
+
+def set_sparse_format(sparse_format):
+    """
+    Sets the :mod:`scipy.sparse` format to which sparse :class:`pandas.DataFrame` objects are converted,
+    before being passed to non-``pandas`` estimators.
+
+    Arguments:
+
+        sparse_format: Either ``'csr'`` (the default) or ``'csc'``.
+
+    Returns:
+
+        The previous format.
+    """
+    if sparse_format not in ('csr', 'csc'):
+        raise ValueError('Expected \'csr\' or \'csc\'; got %s' % sparse_format)
+
+    prev, _policy['sparse_format'] = _policy['sparse_format'], sparse_format
+    return prev
+
+__all__ += ['set_sparse_format']
+
+
+def conversion_stats():
+    """
+    Returns:
+
+        A ``dict`` with the number of frame-to-array conversions performed (``'conversions'``),
+        the number of those which copied the data (``'copies'``), and the total number of
+        bytes copied (``'copied_bytes'``).
+    """
+    with _stats_lock:
+        return dict(_stats)
+
+__all__ += ['conversion_stats']
+
+
+def reset_conversion_stats():
+    """
+    Resets the counters returned by :func:`ibex.conversion_stats`.
+    """
+    with _stats_lock:
+        for k in _stats:
+            _stats[k] = 0
+
+__all__ += ['reset_conversion_stats']
+
+
+def _target_dtype(X, policy):
+    if policy is None:
+        return None
+
+    if isinstance(policy, six.string_types):
+        dtypes = set(X.dtypes)
+        return dtypes.pop() if len(dtypes) == 1 else np.dtype(np.float64)
+
+    return policy
+
+
+def _shares_memory(values, X):
+    if X.shape[0] == 0 or X.shape[1] == 0:
+        return True
+    return np.may_share_memory(values, X.iloc[:, 0].values)
+
+
+def is_sparse_frame(X):
+    if _SparseDataFrame is not None and isinstance(X, _SparseDataFrame):
+        return True
+
+    try:
+        X.sparse
+    except AttributeError:
+        return False
+    return True
+
+
+def _sparse_frame_to_matrix(X):
+    coo = X.to_coo() if _SparseDataFrame is not None and isinstance(X, _SparseDataFrame) else X.sparse.to_coo()
+    values = coo.tocsr() if _policy['sparse_format'] == 'csr' else coo.tocsc()
+
+    dtype = _policy['dtype']
+    if dtype is not None and not isinstance(dtype, six.string_types) and values.dtype != dtype:
+        values = values.astype(dtype)
+
+    with _stats_lock:
+        _stats['conversions'] += 1
+        _stats['copies'] += 1
+        _stats['copied_bytes'] += values.data.nbytes + values.indices.nbytes + values.indptr.nbytes
+
+    return values
+
+
+def sparse_matrix_to_frame(values, index, columns):
+    """
+    Wraps a :mod:`scipy.sparse` matrix in a sparse-backed :class:`pandas.DataFrame`.
+    """
+    if _SparseDataFrame is not None:
+        return _SparseDataFrame(values, index=index, columns=columns, default_fill_value=0)
+    X = pd.DataFrame.sparse.from_spmatrix(values, index=index, columns=columns)
+    # Implicit entries are zeros, whatever fill value the accessor defaults to.
+    dtype = pd.SparseDtype(values.dtype, 0)
+    if any(d != dtype for d in X.dtypes):
+        X = X.astype(dtype)
+    return X
+
+
+def frame_to_array(X):
+    """
+    Converts a :class:`pandas.DataFrame` to a :class:`numpy.ndarray`, according to the current
+    policy (see :func:`ibex.set_dtype_policy`).
+
+    If the frame consists of a single consolidated block of the target dtype, the result
+    is a view of it. Otherwise, each group of same-dtype columns is converted
+    directly into the result, without an intermediate upcast copy of the entire frame.
+
+    A sparse frame is converted to a :mod:`scipy.sparse` matrix instead (see :func:`ibex.set_sparse_format`).
+    """
+    if is_sparse_frame(X):
+        return _sparse_frame_to_matrix(X)
+
+    dtype = _target_dtype(X, _policy['dtype'])
+
+    dtypes = X.dtypes
+    if dtype is None or (dtypes == dtype).all():
+        values = X.values
+    else:
+        values = np.empty(X.shape, dtype=dtype)
+        for col_dtype in set(dtypes):
+            inds = np.flatnonzero((dtypes == col_dtype).values)
+            values[:, inds] = X.iloc[:, inds].values
+
+    copied = not _shares_memory(values, X)
+
+    with _stats_lock:
+        _stats['conversions'] += 1
+        if copied:
+            _stats['copies'] += 1
+            _stats['copied_bytes'] += values.nbytes
+
+    return values
+
+
+def conform_array(values):
+    """
+    Converts a dense 2-d :class:`numpy.ndarray` as :func:`frame_to_array` would convert a frame
+    of it, according to the current policy (see :func:`ibex.set_dtype_policy`).
+    """
+    dtype = _policy['dtype']
+    if dtype is None or isinstance(dtype, six.string_types) or values.dtype == dtype:
+        return values
+
+    values = values.astype(dtype)
+
+    with _stats_lock:
+        _stats['conversions'] += 1
+        _stats['copies'] += 1
+        _stats['copied_bytes'] += values.nbytes
+
+    return values
+
+
+def result_columns(columns, res):
+    """
+    Returns the columns of a frame of the 2-d result ``res`` of a step given ``columns``: these,
+    if there are as many, and blank labels otherwise.
+    """
+    if len(columns) == res.shape[1]:
+        return columns
+    return [' ' for _ in range(res.shape[1])]
+
+
+def result_to_frame(res, index, columns):
+    """
+    Converts an array result of a step to a :class:`pandas.Series` (if it is 1-d) or to a
+    :class:`pandas.DataFrame` (if it is 2-d, possibly sparse) with ``index``, and ``columns`` as
+    given by :func:`result_columns`. Other results are returned as they are.
+    """
+    if isinstance(res, np.ndarray):
+        if len(res.shape) == 1:
+            return pd.Series(res, index=index)
+
+        if len(res.shape) == 2:
+            return pd.DataFrame(res, index=index, columns=result_columns(columns, res))
+
+    if sparse.issparse(res):
+        return sparse_matrix_to_frame(res, index, result_columns(columns, res))
+
+    return res
+
+
+def records_to_array(records, columns):
+    """
+    Converts a list of mappings (e.g., ``dict`` objects) to a :class:`numpy.ndarray`, whose
+    columns are the values of ``columns``, according to the current policy (see :func:`ibex.set_dtype_policy`).
+    """
+    records = list(records)
+    # Each column is typed separately, as in a frame, so that a column of strings does not
+    # turn the others into strings as well.
+    cols = [_record_column([record[c] for record in records]) for c in columns]
+    dtypes = [col.dtype for col in cols]
+
+    dtype = _policy['dtype']
+    if dtype is None:
+        if len(set(dtypes)) == 1:
+            dtype = dtypes[0]
+        elif all(d.kind in 'iuf' for d in dtypes):
+            dtype = np.result_type(*dtypes)
+        else:
+            dtype = np.dtype(object)
+    elif isinstance(dtype, six.string_types):
+        dtype = dtypes[0] if len(set(dtypes)) == 1 else np.dtype(np.float64)
+
+    values = np.empty((len(records), len(cols)), dtype=dtype)
+    for i, col in enumerate(cols):
+        values[:, i] = col
+    return values
+
+
+def _record_column(values):
+    col = np.array(values)
+    if col.dtype.kind in 'biufcmM':
+        return col
+    # As in frames, strings (and any other values) are held as objects.
+    col = np.empty(len(values), dtype=object)
+    col[:] = values
+    return col
+
+
+def records_to_frame(records, columns):
+    """
+    Converts a list of mappings (e.g., ``dict`` objects) to a :class:`pandas.DataFrame` with ``columns``.
+    """
+    return pd.DataFrame([[record[c] for c in columns] for record in records], columns=columns)
@@ -1,16 +1,37 @@
 from __future__ import absolute_import
 
+import ast
+import hashlib
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
 from six import string_types
+import numpy as np
 import pandas as pd
 from sklearn import base
+from sklearn.externals import joblib
+
+try:
+    import numexpr
+except ImportError:
+    numexpr = None
 
 from ._base import FrameMixin
+from . import _cache
+from . import _instrumentation
+from ._parallel import chunked_call
 from ._verify_args import *
 
 
 __all__ = []
 
 
+_missing = object()
+
+
 def _process_cols(cols):
     if cols is None:
         return None
@@ -18,13 +39,59 @@ def _process_cols(cols):
     return [cols] if isinstance(cols, string_types) else list(cols)
 
 
+def _expressions(func):
+    """
+    Returns the ``(column, expression)`` pairs of ``func``, if it is a mapping (or a list of pairs)
+    of output columns to expression strings, ``None`` otherwise.
+    """
+    if isinstance(func, Mapping):
+        return list(func.items())
+    if isinstance(func, list) and func and all(
+            isinstance(e, tuple) and len(e) == 2 and isinstance(e[1], string_types) for e in func):
+        return list(func)
+    return None
+
+
+def _expression_cols(expressions):
+    """
+    Returns the names referenced by the expressions (other than called functions), in order of appearance.
+    """
+    cols = []
+    for _, expression in expressions:
+        tree = ast.parse(expression.strip(), mode='eval')
+        called = set(id(n.func) for n in ast.walk(tree) if isinstance(n, ast.Call))
+        names = sorted(
+            (n for n in ast.walk(tree) if isinstance(n, ast.Name) and id(n) not in called),
+            key=lambda n: (n.lineno, n.col_offset))
+        cols.extend(n.id for n in names if n.id not in cols)
+    return cols
+
+
+def _evaluate(expressions, X, cols):
+    """
+    Evaluates the expressions over the columns ``cols`` of ``X``, by :mod:`numexpr` if it is installed,
+    by :func:`pandas.eval` otherwise. Returns a 2-d array of the results, with a column per expression.
+    """
+    arrays = dict((c, X[c].values) for c in cols)
+    if numexpr is not None:
+        results = [numexpr.evaluate(e, local_dict=arrays, global_dict={}) for _, e in expressions]
+    else:
+        results = [pd.eval(e, engine='python', local_dict=arrays) for _, e in expressions]
+    results = [np.broadcast_to(r, (len(X), )) for r in results]
+
+    values = np.empty((len(X), len(results)), dtype=np.result_type(*results), order='F')
+    for i, r in enumerate(results):
+        values[:, i] = r
+    return values
+
+
 # Tmp Ami - add kw_args, inverse shit
 class FunctionTransformer(base.BaseEstimator, base.TransformerMixin, FrameMixin):
     """
     Transforms them functions.
     """
     # Tmp Ami - This is now a public class; make params take defaults
-    def __init__(self, func, in_cols, out_cols, pass_y, kw_args):
+    def __init__(self, func, in_cols, out_cols, pass_y, kw_args, n_jobs=None, chunk_size=None, cache=None):
         FrameMixin.__init__(self)
 
         params = {
@@ -33,10 +100,14 @@ class FunctionTransformer(base.BaseEstimator, base.TransformerMixin, FrameMixin)
             'out_cols': out_cols,
             'pass_y': pass_y,
             'kw_args': kw_args,
+            'n_jobs': n_jobs,
+            'chunk_size': chunk_size,
+            'cache': cache,
         }
 
         self.set_params(**params)
 
+    @_instrumentation.instrumented
     def fit(self, X, y=None):
         """
         Fits the transformer using ``X`` (and possibly ``y``).
@@ -49,11 +120,9 @@ class FunctionTransformer(base.BaseEstimator, base.TransformerMixin, FrameMixin)
         verify_y_type(y)
 
         self.x_columns = X.columns
+        in_cols, _ = self.__resolve_cols()
 
-        if self.in_cols is not None:
-            Xt = X[self.in_cols]
-        else:
-            Xt = X
+        Xt = X[in_cols] if in_cols is not None else X
 
         if self.func is None:
             return self
@@ -66,6 +135,7 @@ class FunctionTransformer(base.BaseEstimator, base.TransformerMixin, FrameMixin)
 
         return self
 
+    @_instrumentation.instrumented
     def fit_transform(self, X, y=None):
         """
         Fits the transformer using ``X`` (and possibly ``y``), and transforms, in one
@@ -84,26 +154,18 @@ class FunctionTransformer(base.BaseEstimator, base.TransformerMixin, FrameMixin)
             return self.fit(X).transform(X)
 
         self.x_columns = X.columns
+        in_cols, _ = self.__resolve_cols()
 
-        Xt = X[self.x_columns]
+        Xt = self.__select(X, in_cols)
 
-        in_cols = _process_cols(self.in_cols)
-
-        if in_cols is not None:
-            Xt = Xt[in_cols]
-
-        if self.func is None:
-            res = Xt
-        elif isinstance(self.func, FrameMixin):
-            if self.pass_y:
-                res = self.func.fit_transform(Xt, y)
-            else:
-                res = self.func.fit_transform(Xt)
+        if self.pass_y:
+            res = self.func.fit_transform(Xt, y)
         else:
-            res = pd.DataFrame(self.func(Xt), index=Xt.index)
+            res = self.func.fit_transform(Xt)
 
         return self.__process_res(Xt, res)
 
+    @_instrumentation.instrumented
     def transform(self, X, y=None):
         """
         Returns:
@@ -113,12 +175,22 @@ class FunctionTransformer(base.BaseEstimator, base.TransformerMixin, FrameMixin)
         verify_x_type(X)
         verify_y_type(y)
 
-        Xt = X[self.x_columns]
+        in_cols, _ = self.__cols()
 
-        in_cols = _process_cols(self.in_cols)
+        expressions = _expressions(self.func)
+        cache = _cache.as_cache(self.cache) if self.func is not None and not isinstance(self.func, FrameMixin) else None
 
-        if in_cols is not None:
-            Xt = Xt[in_cols]
+        if expressions is not None and cache is None:
+            # The columns are read directly off X, without selecting them into a frame first.
+            return self.__process_res(X, _evaluate(expressions, X, in_cols))
+
+        Xt = self.__select(X, in_cols)
+
+        if cache is not None:
+            key = self.__cache_key(Xt, expressions)
+            res = cache.get(key, _missing) if key is not None else _missing
+            if res is not _missing:
+                return self.__process_res(Xt, res)
 
         if self.func is None:
             res = Xt
@@ -127,22 +199,106 @@ class FunctionTransformer(base.BaseEstimator, base.TransformerMixin, FrameMixin)
                 res = self.func.transform(Xt, y)
             else:
                 res = self.func.transform(Xt)
+        elif expressions is not None:
+            res = _evaluate(expressions, Xt, in_cols)
+        elif self.n_jobs is not None and self.n_jobs != 1:
+            res = chunked_call(self.func, Xt, self.n_jobs, self.chunk_size)
         else:
-            res = pd.DataFrame(self.func(Xt), index=Xt.index)
+            res = self.func(Xt)
+
+        if cache is not None and key is not None:
+            cache.put(key, res)
 
         return self.__process_res(Xt, res)
 
-    def __process_res(self, Xt, res):
-        in_cols = _process_cols(self.in_cols)
-        out_cols = _process_cols(self.out_cols)
+    def _ibex_required_columns(self, fitted):
+        if fitted:
+            columns = FrameMixin._ibex_required_columns(self, fitted)
+            if columns is not None:
+                return columns
+        return self.__in_cols()
+
+    def get_feature_names(self):
+        """
+        Returns the columns of the results. These are known before fitting if either ``out_cols``
+        or expressions (see :func:`ibex.trans`) are given.
+        """
+        if '_ibex_cols' in self.__dict__:
+            return list(self._ibex_cols[1])
+        out_cols = self.__out_cols()
+        if out_cols is None:
+            return list(self.__resolve_cols()[1])
+        return out_cols
+
+    def __resolve_cols(self):
+        # The input columns, and the columns of the results, are resolved once per fit.
+        x_columns = self.x_columns
+        in_cols = self.__in_cols()
+        out_cols = self.__out_cols()
         if out_cols is not None:
-            res_cols = out_cols
+            res_cols = pd.Index(out_cols)
         elif in_cols is not None:
-            res_cols = in_cols
+            res_cols = pd.Index(in_cols)
         else:
-            res_cols = Xt.columns
+            res_cols = x_columns
+        self._ibex_cols = in_cols, res_cols
+        return self._ibex_cols
 
-        res = res.copy()
+    def __in_cols(self):
+        in_cols = _process_cols(self.in_cols)
+        expressions = _expressions(self.func)
+        if in_cols is None and expressions is not None:
+            return _expression_cols(expressions)
+        return in_cols
+
+    def __out_cols(self):
+        out_cols = _process_cols(self.out_cols)
+        expressions = _expressions(self.func)
+        if out_cols is None and expressions is not None:
+            return [c for c, _ in expressions]
+        return out_cols
+
+    def __cols(self):
+        cols = self.__dict__.get('_ibex_cols')
+        return cols if cols is not None else self.__resolve_cols()
+
+    def __select(self, X, in_cols):
+        if in_cols is not None:
+            return X[in_cols]
+        # Selecting is both needless and, for duplicate labels (e.g., blank ones), wrong. A shallow
+        # copy is returned, though, so that the caller's frame is never passed on as a result.
+        if X.columns.equals(self.x_columns):
+            return X.copy(deep=False)
+        return X[self.x_columns]
+
+    def __cache_key(self, Xt, expressions):
+        # The results of a function (or expressions) are determined by its input's content,
+        # the function's identity, and its keyword arguments.
+        func_key = _cache.callable_key(self.func) if expressions is None else joblib.hash(expressions)
+        if func_key is None:
+            return None
+        try:
+            kw_args_key = joblib.hash(self.kw_args)
+        except Exception:
+            return None
+        key = hashlib.sha1()
+        for part in ('trans', _cache.frame_fingerprint(Xt), func_key, kw_args_key):
+            key.update(part.encode('utf-8'))
+        return key.hexdigest()
+
+    def __process_res(self, Xt, res):
+        _, res_cols = self.__cols()
+
+        # Results are relabeled, rather than copied.
+        if isinstance(res, np.ndarray):
+            values = res if res.ndim == 2 else res.reshape(len(res), -1)
+            return pd.DataFrame(values, index=Xt.index, columns=res_cols, copy=False)
+
+        if not isinstance(res, pd.DataFrame) or not res.index.equals(Xt.index):
+            res = pd.DataFrame(res, index=Xt.index)
+        if res.columns.equals(res_cols):
+            return res
+        res = res.copy(deep=False)
         res.columns = res_cols
         return res
 
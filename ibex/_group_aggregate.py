@@ -0,0 +1,227 @@
+from __future__ import absolute_import
+
+from six import string_types
+import numpy as np
+import pandas as pd
+from sklearn import base
+from sklearn import exceptions
+
+from ._base import FrameMixin
+from . import _instrumentation
+from ._verify_args import *
+
+
+__all__ = []
+
+
+# The sufficient statistics each aggregate is derived from. They can all be merged across
+# batches, which is what allows partial_fit.
+_agg_stats = {
+    'count': ['count'],
+    'sum': ['sum'],
+    'mean': ['count', 'sum'],
+    'var': ['count', 'sum', 'sumsq'],
+    'std': ['count', 'sum', 'sumsq'],
+    'min': ['min'],
+    'max': ['max'],
+}
+
+
+def _as_list(cols):
+    if cols is None:
+        return None
+
+    return [cols] if isinstance(cols, string_types) else list(cols)
+
+
+class GroupAggregateTransformer(base.BaseEstimator, base.TransformerMixin, FrameMixin):
+    """
+    Transforms each row to aggregates (e.g., the mean) of columns over the rows sharing its group,
+    as computed in :meth:`fit`.
+
+    The aggregates are computed once per fit, and stored in a lookup table indexed by the groups;
+    transforming maps the rows through the table in a single vectorized lookup.
+
+    Arguments:
+
+        by: The column (or list of columns) whose values define the groups.
+
+        columns: The column (or list of columns) to aggregate. If ``None``, all columns not in ``by``.
+
+        aggs: The aggregate (or list of aggregates), each one of ``'count'``, ``'sum'``, ``'mean'``,
+            ``'var'``, ``'std'``, ``'min'``, and ``'max'``. Missing values are skipped, as in
+            :meth:`pandas.DataFrame.groupby`.
+
+        fill_value: The value of the aggregates for groups not seen in fit.
+
+    The result has a column per aggregated column and aggregate, named ``'<column>_<agg>'``.
+
+    Example:
+
+        >>> import pandas as pd
+        >>> from ibex.sklearn import preprocessing as pd_preprocessing
+        >>>
+        >>> X = pd.DataFrame({'user': [1, 1, 2, 3], 'rating': [4., 2., 5., 1.]})
+        >>> trn = pd_preprocessing.GroupAggregateTransformer('user', 'rating', ['mean', 'count'], fill_value=0)
+        >>> trn.fit_transform(X)
+           rating_mean  rating_count
+        0          3.0           2.0
+        1          3.0           2.0
+        2          5.0           1.0
+        3          1.0           1.0
+        >>> trn.transform(pd.DataFrame({'user': [2, 4], 'rating': [0., 0.]}))
+           rating_mean  rating_count
+        0          5.0           1.0
+        1          0.0           0.0
+
+        :meth:`partial_fit` merges the statistics of more rows into those seen so far.
+
+        >>> trn.partial_fit(pd.DataFrame({'user': [2, 4], 'rating': [3., 3.]})).table_
+              rating_mean  rating_count
+        user
+        1             3.0           2.0
+        2             4.0           2.0
+        3             1.0           1.0
+        4             3.0           1.0
+    """
+    def __init__(self, by, columns=None, aggs='mean', fill_value=np.nan):
+        FrameMixin.__init__(self)
+
+        self.by = by
+        self.columns = columns
+        self.aggs = aggs
+        self.fill_value = fill_value
+
+    @_instrumentation.instrumented
+    def fit(self, X, y=None):
+        """
+        Computes the aggregates of the groups of ``X``.
+
+        Returns:
+
+            ``self``
+        """
+        verify_x_type(X)
+        verify_y_type(y)
+
+        self.x_columns = X.columns
+        self.stats_ = self.__stats(X)
+        self.__update_table()
+
+        return self
+
+    @_instrumentation.instrumented
+    def partial_fit(self, X, y=None):
+        """
+        Updates the aggregates by the rows of ``X``, without recomputing those of the rows seen so far.
+        The results are those of fitting on all the rows.
+
+        Returns:
+
+            ``self``
+        """
+        if 'stats_' not in self.__dict__:
+            return self.fit(X, y)
+
+        verify_x_type(X)
+        verify_y_type(y)
+
+        self.stats_ = self.__merge(self.stats_, self.__stats(X))
+        self.__update_table()
+
+        return self
+
+    @_instrumentation.instrumented
+    def transform(self, X, y=None):
+        """
+        Returns:
+
+            The aggregates of the group of each row of ``X``.
+        """
+        verify_x_type(X)
+        verify_y_type(y)
+
+        if 'table_' not in self.__dict__:
+            raise exceptions.NotFittedError('This GroupAggregateTransformer is not fitted')
+
+        by = _as_list(self.by)
+        if len(by) == 1:
+            keys = X[by[0]].values
+        else:
+            keys = pd.MultiIndex.from_arrays([X[c].values for c in by])
+        # Unseen groups are at -1, which is the last row of the lookup: that of the fill values.
+        inds = self.table_.index.get_indexer(keys)
+
+        return pd.DataFrame(self._ibex_lookup.take(inds, axis=0), index=X.index, columns=self.table_.columns)
+
+    def _ibex_required_columns(self, fitted):
+        columns = _as_list(self.columns)
+        if columns is None:
+            return FrameMixin._ibex_required_columns(self, fitted)
+        return _as_list(self.by) + columns
+
+    def __aggs(self):
+        aggs = _as_list(self.aggs)
+        unknown = [agg for agg in aggs if agg not in _agg_stats]
+        if unknown:
+            raise ValueError('Unsupported aggregates: %s' % unknown)
+        return aggs
+
+    def __stats(self, X):
+        by = _as_list(self.by)
+        columns = _as_list(self.columns)
+        if columns is None:
+            columns = [c for c in X.columns if c not in by]
+
+        needed = set(stat for agg in self.__aggs() for stat in _agg_stats[agg])
+        keys = [X[c] for c in by]
+        values = X[columns]
+        grouped = values.groupby(keys)
+
+        stats = {}
+        for stat in needed:
+            if stat == 'sumsq':
+                stats[stat] = (values ** 2).groupby(keys).sum()
+            else:
+                stats[stat] = getattr(grouped, stat)()
+        return pd.concat(stats, axis=1)
+
+    def __merge(self, stats, batch):
+        index = stats.index.union(batch.index)
+        stats, batch = stats.reindex(index), batch.reindex(index)
+
+        merged = {}
+        for stat in stats.columns.get_level_values(0).unique():
+            if stat == 'min':
+                merged[stat] = np.fmin(stats[stat], batch[stat])
+            elif stat == 'max':
+                merged[stat] = np.fmax(stats[stat], batch[stat])
+            else:
+                merged[stat] = stats[stat].add(batch[stat], fill_value=0)
+        return pd.concat(merged, axis=1)
+
+    def __update_table(self):
+        stats = self.stats_
+        columns = list(stats[stats.columns.get_level_values(0)[0]].columns)
+
+        table = {}
+        for c in columns:
+            for agg in self.__aggs():
+                if agg in ('count', 'sum', 'min', 'max'):
+                    res = stats[agg][c]
+                else:
+                    n, s = stats['count'][c], stats['sum'][c]
+                    mean = s / n
+                    if agg == 'mean':
+                        res = mean
+                    else:
+                        res = (stats['sumsq'][c] - s * mean) / (n - 1)
+                        res = res.where(n > 1).clip(lower=0)
+                        if agg == 'std':
+                            res = np.sqrt(res)
+                table['%s_%s' % (c, agg)] = res.astype(np.float64)
+        order = ['%s_%s' % (c, agg) for c in columns for agg in self.__aggs()]
+        self.table_ = pd.DataFrame(table, index=stats.index, columns=order)
+
+        fill = np.full((1, len(order)), self.fill_value, dtype=np.float64)
+        self._ibex_lookup = np.vstack([self.table_.values, fill])
@@ -0,0 +1,240 @@
+from __future__ import absolute_import
+
+
+import time
+import functools
+import threading
+import contextlib
+import collections
+
+import pandas as pd
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+
+__all__ = []
+
+
+StepRecord = collections.namedtuple(
+    'StepRecord',
+    [
+        'path',
+        'estimator',
+        'method',
+        'wall_time',
+        'cpu_time',
+        'rows_in',
+        'columns_in',
+        'rows_out',
+        'columns_out',
+        'peak_bytes',
+    ])
+StepRecord.__doc__ = """
+A record of a single call of a method of an estimator (see :func:`ibex.profile`).
+
+Attributes:
+
+    path: A tuple of the class names of the estimators whose calls (in the calling thread)
+        enclose this one, ending with that of ``estimator``.
+
+    estimator: The estimator.
+
+    method: The name of the method (e.g., ``'fit'``, ``'transform'``, or ``'predict'``).
+
+    wall_time: The elapsed time, in seconds.
+
+    cpu_time: The CPU time of the process, in seconds (which includes that of other threads).
+
+    rows_in, columns_in: The shape of the input.
+
+    rows_out, columns_out: The shape of the result (``None`` if it has none, e.g., for ``fit``).
+
+    peak_bytes: The peak memory allocated by Python during the call, beyond that allocated before
+        it, if memory is traced (``None`` otherwise).
+"""
+
+__all__ += ['StepRecord']
+
+
+# The active profiles; while empty, calls are not instrumented.
+_profiles = []
+_profiles_lock = threading.Lock()
+
+_calls = threading.local()
+
+_cpu_time = getattr(time, 'process_time', time.clock if hasattr(time, 'clock') else time.time)
+
+
+class Profile(object):
+    """
+    The records of the calls made within :func:`ibex.profile`.
+
+    Attributes:
+
+        records: A ``list`` of :class:`ibex.StepRecord` objects, in order of the calls' completion
+            (so nested calls precede the calls enclosing them).
+    """
+    def __init__(self, callback, memory):
+        self.records = []
+        self._callback = callback
+        self._memory = memory
+        self._lock = threading.Lock()
+
+    def _add(self, record):
+        with self._lock:
+            self.records.append(record)
+        if self._callback is not None:
+            self._callback(record)
+
+    def to_frame(self):
+        """
+        Returns the records as a :class:`pandas.DataFrame`, with a row per record, and a column
+        per field (with the estimators' class names in place of the estimators).
+        """
+        with self._lock:
+            records = list(self.records)
+        frame = pd.DataFrame.from_records(records, columns=StepRecord._fields)
+        frame['estimator'] = [type(r.estimator).__name__ for r in records]
+        return frame
+
+__all__ += ['Profile']
+
+
+@contextlib.contextmanager
+def profile(callback=None, memory=False):
+    """
+    Records the calls of the methods of ibex estimators (adapters, pipelines, and unions) made within
+    the context, along with their times, the shapes of their inputs and results, and, optionally,
+    their peak memory allocation.
+
+    Calls made in worker processes (e.g., by ``n_jobs`` with a process backend) are not recorded.
+    Outside this context, instrumentation costs a single check per call.
+
+    Arguments:
+
+        callback: If not ``None``, a callable called with each :class:`ibex.StepRecord`
+            on the completion of its call.
+
+        memory: Whether to trace the peak memory allocation of each call (through :mod:`tracemalloc`,
+            which slows down allocations considerably).
+
+    Yields:
+
+        A :class:`ibex.Profile`, holding the records.
+
+    Example:
+
+        >>> import pandas as pd
+        >>> import ibex
+        >>> from ibex.sklearn import preprocessing as pd_preprocessing
+        >>> from ibex.sklearn import linear_model as pd_linear_model
+        >>>
+        >>> X = pd.DataFrame({'a': [1., 2., 3.], 'b': [4., 5., 7.]})
+        >>> y = pd.Series([1., 2., 3.])
+        >>> clf = pd_preprocessing.StandardScaler() | pd_linear_model.LinearRegression()
+        >>> with ibex.profile() as prof:
+        ...     clf.fit(X, y).predict(X)
+        0 ...
+        >>> [(r.path, r.method, r.rows_in, r.columns_in) for r in prof.records]
+        [(('Pipeline', 'StandardScaler'), 'fit_transform', 3, 2),
+         (('Pipeline', 'LinearRegression'), 'fit', 3, 2),
+         (('Pipeline',), 'fit', 3, 2),
+         (('Pipeline', 'StandardScaler'), 'transform', 3, 2),
+         (('Pipeline', 'LinearRegression'), 'predict', 3, 2),
+         (('Pipeline',), 'predict', 3, 2)]
+    """
+    prof = Profile(callback, memory and tracemalloc is not None)
+    started = prof._memory and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    with _profiles_lock:
+        _profiles.append(prof)
+    try:
+        yield prof
+    finally:
+        with _profiles_lock:
+            _profiles.remove(prof)
+        if started:
+            tracemalloc.stop()
+
+__all__ += ['profile']
+
+
+def _shape(obj):
+    shape = getattr(obj, 'shape', None)
+    if not isinstance(shape, tuple) or not shape:
+        return None, None
+    return shape[0], shape[1] if len(shape) > 1 else 1
+
+
+def call(est, method, X, fn, *args, **kwargs):
+    """
+    Returns ``fn(X, *args, **kwargs)``, the call of method ``method`` of ``est``, recording it in each
+    active profile (see :func:`profile`).
+    """
+    if not _profiles:
+        return fn(X, *args, **kwargs)
+    return _recorded_call(est, method, X, fn, args, kwargs)
+
+
+def _recorded_call(est, method, X, fn, args, kwargs):
+    with _profiles_lock:
+        profiles = list(_profiles)
+    memory = any(p._memory for p in profiles) and tracemalloc.is_tracing()
+
+    try:
+        stack = _calls.stack
+    except AttributeError:
+        stack = _calls.stack = []
+    # Each entry holds the enclosing class names, and, if tracing memory, the allocation at the
+    # call's start and the highest peak seen by the calls it encloses.
+    path = (stack[-1][0] if stack else ()) + (type(est).__name__, )
+    entry = [path, None, 0]
+    if memory:
+        current, peak = tracemalloc.get_traced_memory()
+        if stack:
+            stack[-1][2] = max(stack[-1][2], peak)
+        if hasattr(tracemalloc, 'reset_peak'):
+            tracemalloc.reset_peak()
+        entry[1] = current
+    stack.append(entry)
+
+    wall_start, cpu_start = time.time(), _cpu_time()
+    try:
+        res = fn(X, *args, **kwargs)
+    finally:
+        wall_time, cpu_time = time.time() - wall_start, _cpu_time() - cpu_start
+        stack.pop()
+        peak_bytes = None
+        if memory:
+            peak = max(tracemalloc.get_traced_memory()[1], entry[2])
+            peak_bytes = max(peak - entry[1], 0)
+            if stack:
+                stack[-1][2] = max(stack[-1][2], peak)
+
+    rows_in, columns_in = _shape(X)
+    rows_out, columns_out = _shape(res)
+    record = StepRecord(
+        path, est, method, wall_time, cpu_time, rows_in, columns_in, rows_out, columns_out, peak_bytes)
+    for prof in profiles:
+        prof._add(record)
+    return res
+
+
+def instrumented(method):
+    """
+    Decorates a method of an estimator, whose first argument is the input, to be recorded in each
+    active profile (see :func:`profile`).
+    """
+    name = method.__name__
+
+    @functools.wraps(method)
+    def wrapper(self, X, *args, **kwargs):
+        if not _profiles:
+            return method(self, X, *args, **kwargs)
+        return _recorded_call(self, name, X, functools.partial(method, self), args, kwargs)
+
+    return wrapper
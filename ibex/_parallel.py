@@ -0,0 +1,174 @@
+from __future__ import absolute_import
+
+
+import os
+import atexit
+import threading
+import multiprocessing
+from multiprocessing import pool as _pool
+
+from ._utils import iter_batches, concat_results
+
+
+__all__ = []
+
+
+_ops = threading.local()
+
+
+def in_op(est):
+    """
+    Returns whether the current thread is within a wrapped call of ``est``.
+    """
+    return id(est) in getattr(_ops, 'ids', ())
+
+
+def enter_op(est):
+    try:
+        _ops.ids.add(id(est))
+    except AttributeError:
+        _ops.ids = set([id(est)])
+
+
+def exit_op(est):
+    _ops.ids.discard(id(est))
+
+
+_worker_est = {}
+
+
+def _init_worker(est):
+    _worker_est['est'] = est
+
+
+def _call_worker(task):
+    name, X, args, kwargs = task
+    return getattr(_worker_est['est'], name)(X, *args, **kwargs)
+
+
+def _effective_n_jobs(n_jobs):
+    if n_jobs < 0:
+        return max(multiprocessing.cpu_count() + 1 + n_jobs, 1)
+    if n_jobs == 0:
+        raise ValueError('n_jobs == 0 has no meaning')
+    return n_jobs
+
+
+def parallel_call(est, name, X, n_jobs, backend, *args, **kwargs):
+    """
+    Calls method ``name`` of ``est`` on row shards of ``X`` in parallel, and concatenates
+    the results in the original row order.
+
+    Arguments:
+
+        est: The (fitted) estimator.
+
+        name: The name of the method to call (e.g., ``'predict'``).
+
+        X: :class:`pandas.DataFrame` of the data.
+
+        n_jobs: The number of workers (negative numbers count back from the number of CPUs,
+            as in :mod:`sklearn`).
+
+        backend: Either ``'threading'``, in which case the workers share ``est``, or
+            ``'multiprocessing'``, in which case ``est`` is passed once to each worker process
+            (inherited without pickling where processes are forked), rather than once per shard.
+    """
+    if backend not in ('threading', 'multiprocessing'):
+        raise ValueError('Expected \'threading\' or \'multiprocessing\'; got %s' % backend)
+
+    n_jobs = min(_effective_n_jobs(n_jobs), len(X))
+    if n_jobs <= 1:
+        return getattr(est, name)(X, *args, **kwargs)
+
+    shards = list(iter_batches(X, -(-len(X) // n_jobs)))
+
+    if backend == 'threading':
+        workers = _pool.ThreadPool(len(shards))
+        fn = getattr(est, name)
+        map_fn, tasks = lambda X_: fn(X_, *args, **kwargs), shards
+    else:
+        workers = multiprocessing.Pool(len(shards), initializer=_init_worker, initargs=(est, ))
+        map_fn, tasks = _call_worker, [(name, X_, args, kwargs) for X_ in shards]
+
+    try:
+        res = workers.map(map_fn, tasks)
+    except BaseException:
+        workers.terminate()
+        raise
+    else:
+        workers.close()
+    finally:
+        workers.join()
+
+    return concat_results(res)
+
+
+# Persistent process pools, by number of workers, along with the id of the process owning them.
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def persistent_pool(n_jobs):
+    """
+    Returns a pool of ``n_jobs`` worker processes, created on first use, and reused by subsequent
+    calls until the process exits.
+    """
+    n_jobs = _effective_n_jobs(n_jobs)
+    with _pools_lock:
+        pid, pool = _pools.get(n_jobs, (None, None))
+        # A pool inherited by a forked process is of no use to it.
+        if pool is None or pid != os.getpid():
+            pool = multiprocessing.Pool(n_jobs)
+            _pools[n_jobs] = (os.getpid(), pool)
+        return pool
+
+
+def _close_pools():
+    with _pools_lock:
+        for pid, pool in _pools.values():
+            if pid == os.getpid():
+                pool.terminate()
+                pool.join()
+        _pools.clear()
+
+
+atexit.register(_close_pools)
+
+
+def _apply_worker(task):
+    fn, X = task
+    return fn(X)
+
+
+def chunked_call(fn, X, n_jobs, chunk_size=None):
+    """
+    Calls ``fn`` on row chunks of ``X`` over a persistent pool of worker processes
+    (see :func:`persistent_pool`), and concatenates the results in the original row order.
+
+    Arguments:
+
+        fn: A picklable callable (e.g., a module-level function).
+
+        X: :class:`pandas.DataFrame` of the data.
+
+        n_jobs: The number of workers (negative numbers count back from the number of CPUs,
+            as in :mod:`sklearn`).
+
+        chunk_size: The maximal number of rows per chunk. If ``None``, the rows are split evenly
+            between the workers.
+    """
+    n_jobs = _effective_n_jobs(n_jobs)
+    # Daemonic processes (e.g., the workers of a pool) cannot start workers of their own.
+    if n_jobs <= 1 or len(X) <= 1 or multiprocessing.current_process().daemon:
+        return fn(X)
+
+    # The pool is that of the requested number of workers (whatever the number of rows), and
+    # only the number of chunks is bounded by the rows.
+    if chunk_size is None:
+        chunk_size = -(-len(X) // min(n_jobs, len(X)))
+    chunks = list(iter_batches(X, chunk_size))
+    if len(chunks) == 1:
+        return fn(X)
+
+    return concat_results(persistent_pool(n_jobs).map(_apply_worker, [(fn, X_) for X_ in chunks]))
@@ -0,0 +1,68 @@
+from __future__ import absolute_import
+
+
+from sklearn.externals import joblib
+
+
+__all__ = []
+
+
+def dump(est, filename, compress=0):
+    """
+    Persists an estimator, including its fitted state, to a file.
+
+    Arguments:
+
+        est: The estimator (e.g., an adapted estimator, a :class:`ibex.sklearn.pipeline.Pipeline`,
+            or a :class:`ibex.sklearn.pipeline.FeatureUnion`).
+
+        filename: The name of the file.
+
+        compress: The compression level, as in :func:`sklearn.externals.joblib.dump`. Note that
+            the arrays of a compressed file cannot be memory-mapped by :func:`ibex.load`.
+
+    Returns:
+
+        The list of file names written.
+
+    Example:
+
+        >>> import os
+        >>> import tempfile
+        >>> import pandas as pd
+        >>> import ibex
+        >>> from ibex.sklearn import linear_model as pd_linear_model
+        >>>
+        >>> X = pd.DataFrame({'a': [1, 2, 3], 'b': [3, 2, 0]})
+        >>> y = pd.Series([1, 2, 3])
+        >>> prd = pd_linear_model.LinearRegression().fit(X, y)
+        >>>
+        >>> filename = os.path.join(tempfile.mkdtemp(), 'prd.pkl')
+        >>> _ = ibex.dump(prd, filename)
+        >>> ibex.load(filename, mmap_mode='r').predict(X).equals(prd.predict(X))
+        True
+    """
+    return joblib.dump(est, filename, compress=compress)
+
+__all__ += ['dump']
+
+
+def load(filename, mmap_mode=None):
+    """
+    Loads an estimator persisted by :func:`ibex.dump`.
+
+    Arguments:
+
+        filename: The name of the file.
+
+        mmap_mode: If not ``None``, the mode (e.g., ``'r'``) with which to memory-map the
+            estimator's arrays, instead of reading them into memory. Processes loading
+            the same file this way share a single copy of the arrays.
+
+    Returns:
+
+        The estimator.
+    """
+    return joblib.load(filename, mmap_mode=mmap_mode)
+
+__all__ += ['load']
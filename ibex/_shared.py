@@ -0,0 +1,245 @@
+from __future__ import absolute_import
+
+
+import os
+import shutil
+import weakref
+import tempfile
+import threading
+import contextlib
+
+import six
+import numpy as np
+import pandas as pd
+
+
+__all__ = []
+
+
+# Frames with fewer bytes of numeric data than this are passed to workers as they are.
+_min_nbytes = 1e6
+
+# dtype kinds of the columns written to files; other columns are pickled with the handle.
+_shared_kinds = 'biufcmM'
+
+
+def _root(nbytes):
+    """
+    Returns the directory under which to publish ``nbytes`` bytes: ``/dev/shm`` if it
+    exists and has room, ``None`` (i.e., the system's temporary directory) otherwise.
+    """
+    shm = '/dev/shm'
+    try:
+        if os.access(shm, os.W_OK):
+            stat = os.statvfs(shm)
+            if stat.f_bavail * stat.f_frsize > 2 * nbytes:
+                return shm
+    except (AttributeError, OSError):
+        pass
+    return None
+
+
+def _shared_nbytes(X):
+    dtypes = [X.dtype] if isinstance(X, pd.Series) else X.dtypes
+    return sum(
+        len(X) * dtype.itemsize for dtype in dtypes
+        if isinstance(dtype, np.dtype) and dtype.kind in _shared_kinds)
+
+
+# Frames attached in this process, by directory.
+_attached = weakref.WeakValueDictionary()
+_attached_lock = threading.Lock()
+
+
+class SharedFrame(object):
+    """
+    A handle of a :class:`pandas.DataFrame` (or :class:`pandas.Series`) whose numeric columns
+    were written, once, to memory-mapped files (see :func:`shared`).
+
+    The handle pickles to a few file names (plus any non-numeric columns), so it can be passed to
+    worker processes cheaply. Each worker rebuilds the frame, by :meth:`frame`, over the read-only
+    mapped files; if the columns share a single dtype, this involves no copying.
+    """
+    def __init__(self, directory, n, blocks, others, columns, index, name, is_series):
+        self.directory = directory
+        self._n = n
+        self._blocks = blocks
+        self._others = others
+        self._columns = columns
+        self._index = index
+        self._name = name
+        self._is_series = is_series
+
+    def __len__(self):
+        return self._n
+
+    def frame(self):
+        """
+        Returns the shared frame (or series).
+        """
+        with _attached_lock:
+            X = _attached.get(self.directory)
+        if X is None:
+            X = self._attach()
+            with _attached_lock:
+                _attached[self.directory] = X
+        return X
+
+    def _attach(self):
+        index = self._index
+        if isinstance(index, six.string_types):
+            index = pd.Index(np.load(os.path.join(self.directory, index), mmap_mode='r'), name=self._name[1])
+
+        if self._is_series:
+            values = np.load(os.path.join(self.directory, self._blocks[0][0]), mmap_mode='r')
+            return pd.Series(values[:, 0], index=index, name=self._name[0], copy=False)
+
+        if not self._others and len(self._blocks) == 1:
+            values = np.load(os.path.join(self.directory, self._blocks[0][0]), mmap_mode='r')
+            return pd.DataFrame(values, index=index, columns=self._columns, copy=False)
+
+        parts, positions = [], []
+        for file_name, block_positions in self._blocks:
+            values = np.load(os.path.join(self.directory, file_name), mmap_mode='r')
+            parts.append(pd.DataFrame(values, index=index, copy=False))
+            positions.extend(block_positions)
+        if self._others is not None:
+            others, other_positions = self._others
+            others = others.copy(deep=False)
+            others.index = index
+            parts.append(others)
+            positions.extend(other_positions)
+        X = pd.concat(parts, axis=1).iloc[:, np.argsort(positions)]
+        X.columns = self._columns
+        return X
+
+    def close(self):
+        """
+        Removes the files of the shared frame.
+        """
+        with _attached_lock:
+            _attached.pop(self.directory, None)
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _publish(X):
+    is_series = isinstance(X, pd.Series)
+    X_ = X.to_frame() if is_series else X
+
+    dtypes = list(X_.dtypes)
+    groups = {}
+    other_positions = []
+    for i, dtype in enumerate(dtypes):
+        if isinstance(dtype, np.dtype) and dtype.kind in _shared_kinds:
+            groups.setdefault(dtype, []).append(i)
+        else:
+            other_positions.append(i)
+
+    index = X_.index
+    share_index = not isinstance(index, (pd.MultiIndex, pd.RangeIndex)) and \
+        isinstance(index.dtype, np.dtype) and index.dtype.kind in _shared_kinds
+
+    directory = tempfile.mkdtemp(prefix='ibex-shared-', dir=_root(_shared_nbytes(X_)))
+    try:
+        blocks = []
+        for i, (dtype, positions) in enumerate(groups.items()):
+            file_name = '%d.npy' % i
+            mm = np.lib.format.open_memmap(
+                os.path.join(directory, file_name), mode='w+', dtype=dtype, shape=(len(X_), len(positions)), fortran_order=True)
+            for j, position in enumerate(positions):
+                mm[:, j] = X_.iloc[:, position].values
+            mm.flush()
+            del mm
+            blocks.append((file_name, positions))
+        if share_index:
+            np.save(os.path.join(directory, 'index.npy'), index.values)
+    except Exception:
+        shutil.rmtree(directory, ignore_errors=True)
+        raise
+
+    others = (X_.iloc[:, other_positions], other_positions) if other_positions else None
+    return SharedFrame(
+        directory,
+        len(X_),
+        blocks,
+        others,
+        X_.columns,
+        'index.npy' if share_index else index,
+        (X.name if is_series else None, index.name),
+        is_series)
+
+
+@contextlib.contextmanager
+def shared(X, min_nbytes=None):
+    """
+    Publishes ``X`` for the duration of the context, yielding a picklable :class:`SharedFrame`,
+    to be passed to worker processes instead of ``X``. The files are removed on exit.
+
+    Yields ``X`` itself if it is neither a :class:`pandas.DataFrame` nor a :class:`pandas.Series`,
+    or has less than ``min_nbytes`` (if ``None``, ``_min_nbytes``) bytes of numeric data (for which
+    publishing does not pay).
+
+    Example:
+
+        >>> import pandas as pd
+        >>> from ibex._shared import shared, attach
+        >>>
+        >>> X = pd.DataFrame({'a': [1., 2., 3.], 'b': [4., 5., 6.]})
+        >>> with shared(X, min_nbytes=0) as handle:
+        ...     attach(handle)
+        ...
+             a    b
+        0  1.0  4.0
+        1  2.0  5.0
+        2  3.0  6.0
+    """
+    if min_nbytes is None:
+        min_nbytes = _min_nbytes
+    if not isinstance(X, (pd.DataFrame, pd.Series)) or _shared_nbytes(X) < min_nbytes:
+        yield X
+        return
+
+    handle = _publish(X)
+    try:
+        yield handle
+    finally:
+        handle.close()
+
+
+def attach(X):
+    """
+    Returns the frame of ``X`` if it is a :class:`SharedFrame`, ``X`` itself otherwise.
+    """
+    return X.frame() if isinstance(X, SharedFrame) else X
+
+
+@contextlib.contextmanager
+def _as_is(X):
+    yield X
+
+
+def shared_for_jobs(X, n_jobs, min_nbytes=None):
+    """
+    Returns :func:`shared` of ``X`` (with ``min_nbytes``) if ``n_jobs`` denotes more than a single
+    worker, and a context yielding ``X`` itself otherwise.
+    """
+    return shared(X, min_nbytes) if n_jobs is not None and n_jobs != 1 else _as_is(X)
+
+
+@contextlib.contextmanager
+def shared_many_for_jobs(Xs, n_jobs):
+    """
+    As :func:`shared_for_jobs`, but for a list of objects (possibly containing the same object
+    multiple times, which is shared once). Yields the list of the results.
+    """
+    contexts, handles = [], {}
+    try:
+        for X in Xs:
+            if id(X) not in handles:
+                context = shared_for_jobs(X, n_jobs)
+                handles[id(X)] = context.__enter__()
+                contexts.append(context)
+        yield [handles[id(X)] for X in Xs]
+    finally:
+        for context in reversed(contexts):
+            context.__exit__(None, None, None)
@@ -1,6 +1,7 @@
 import functools
 
 import six
+import numpy as np
 import pandas as pd
 
 
@@ -34,9 +35,40 @@ def verify_y_type(y):
 
 def update_class_wrapper(new_class, orig_class):
     if six.PY3:
-        new_class.__doc__ = _wrap_msg + orig_class.__doc__
+        new_class.__doc__ = _wrap_msg + (orig_class.__doc__ or '')
 
 
 def update_method_wrapper(new_class, orig_class, method_name):
     functools.update_wrapper(getattr(new_class, method_name), getattr(orig_class, method_name))
-    getattr(new_class, method_name).__doc__ = _wrap_msg + getattr(orig_class, method_name).__doc__
+    getattr(new_class, method_name).__doc__ = _wrap_msg + (getattr(orig_class, method_name).__doc__ or '')
+
+
+def iter_batches(X, batch_size):
+    """
+    Yields consecutive row slices of ``X``, each of at most ``batch_size`` rows.
+    """
+    if batch_size < 1:
+        raise ValueError('Expected a positive batch size; got %s' % batch_size)
+
+    for start in range(0, len(X), batch_size):
+        yield X.iloc[start: start + batch_size]
+
+
+def concat_results(results):
+    """
+    Concatenates (vertically) the results of calling a method on consecutive row slices.
+    """
+    if isinstance(results[0], (pd.Series, pd.DataFrame)):
+        return pd.concat(results)
+    return np.concatenate(results)
+
+
+def batched_call(fn, X, batch_size, *args, **kwargs):
+    """
+    Calls ``fn`` on ``X``, at most ``batch_size`` rows at a time (all at once if
+    ``batch_size`` is ``None``), and concatenates the results.
+    """
+    if batch_size is None or len(X) <= batch_size:
+        return fn(X, *args, **kwargs)
+
+    return concat_results([fn(X_, *args, **kwargs) for X_ in iter_batches(X, batch_size)])
@@ -7,23 +7,57 @@ import six
 import numpy as np
 from sklearn import base
 
+from ._conversion import frame_to_array
+from ._parallel import in_op, enter_op, exit_op
+from ._shared import attach, SharedFrame
 
-def _from_pickle(est, params):
-    return frame(est)(**params)
+
+def _from_pickle(estimator, orig_X, orig_y):
+    _Adapter = _make_xy_class(estimator, [orig_X, orig_y])
+    return _Adapter.__new__(_Adapter)
 
 
 def make_xy_estimator(estimator, orig_X, orig_y=None):
-    def get_set_params(est):
-        base_attr = getattr(estimator, '__init__')
-        if six.PY3:
-            args = list(inspect.signature(base_attr).parameters)
-        else:
-            args = inspect.getargspec(base_attr)[0]
-        orig_args = est.get_params()
-        args = {arg: orig_args[arg] for arg in args if arg in orig_args}
-        return args
+    """
+    Returns an estimator taking row indices in place of ``orig_X`` (and ``orig_y``), along with
+    these indices.
+
+    ``orig_X`` and ``orig_y`` can be :class:`ibex._shared.SharedFrame` handles. Pickling the estimator
+    (e.g., to pass it to worker processes) pickles only such handles, never the data itself; once the
+    handles are no longer needed, the frames should be set back by :func:`set_xy_data`.
+    """
+    _Adapter = _make_xy_class(estimator, [orig_X, orig_y])
+
+    n = len(orig_X)
+    X_ = np.arange(n).reshape((n, 1))
+    y_ = None if orig_y is None else np.arange(n)
+
+    return _Adapter(**_params(estimator, estimator)), X_, y_
+
+
+def set_xy_data(est, orig_X, orig_y=None):
+    """
+    Sets the data of ``est`` (and of any other estimator of its class, e.g., its clones), an estimator
+    returned by :func:`make_xy_estimator`, to ``orig_X`` and ``orig_y``.
+    """
+    type(est)._ibex_data[:] = [orig_X, orig_y]
 
+
+def _params(estimator, est):
+    base_attr = getattr(estimator, '__init__')
+    if six.PY3:
+        args = list(inspect.signature(base_attr).parameters)
+    else:
+        args = inspect.getargspec(base_attr)[0]
+    orig_args = est.get_params()
+    return {arg: orig_args[arg] for arg in args if arg in orig_args}
+
+
+def _make_xy_class(estimator, data):
     class _Adapter(type(estimator)):
+        # The original X and y, shared by the instances of the class (e.g., clones).
+        _ibex_data = data
+
         def fit_transform(self, X, *args):
             return self.__run(super(_Adapter, self).fit_transform, 'fit_transform', X, *args)
 
@@ -91,7 +125,7 @@ def make_xy_estimator(estimator, orig_X, orig_y=None):
             return self.__run(super(_Adapter, self).score, 'score', X, *args)
 
         def __run(self, fn, name, X, *args):
-            if hasattr(self, '_ibex_in_op'):
+            if in_op(self):
                 return fn(X, *args)
 
             inds = X[:, 0]
@@ -105,27 +139,29 @@ def make_xy_estimator(estimator, orig_X, orig_y=None):
             # Tmp Ami - write a ut for this; remove todo from docs
             if len(params) > 2 and params[2] == 'y' and len(args) > 0 and args[0] is not None:
                 args = list(args)[:]
-                args[0] = orig_y.ix[inds]
+                args[0] = attach(data[1]).ix[inds]
+
+            X = attach(data[0]).ix[inds]
+            if getattr(estimator, '_ibex_array_input', False):
+                X = frame_to_array(X)
 
-            self._ibex_in_op = True
+            enter_op(self)
             try:
-                res = fn(orig_X.ix[inds], *args)
+                res = fn(X, *args)
             finally:
-                delattr(self, '_ibex_in_op')
+                exit_op(self)
 
             return res
 
+        # Only the handles of shared frames are pickled, never the data (see make_xy_estimator).
         def __reduce__(self):
-            return (_from_pickle, (est, self.get_params(deep=True), ))
+            handles = [d if isinstance(d, SharedFrame) else None for d in data]
+            return (_from_pickle, (estimator, handles[0], handles[1]), self.__dict__)
 
         @property
         def orig_estimator(self):
             est = base.clone(estimator)
-            return est.set_params(**get_set_params(self))
+            return est.set_params(**_params(estimator, self))
 
+    return _Adapter
 
-    n = len(orig_X)
-    X_ = np.arange(n).reshape((n, 1))
-    y_ = None if orig_y is None else np.arange(n)
-
-    return _Adapter(**get_set_params(estimator)), X_, y_
@@ -39,9 +39,14 @@ Example:
 from __future__ import absolute_import
 
 
+import os
 import sys
 import imp
 import string
+import marshal
+import hashlib
+import binascii
+import tempfile
 
 import six
 import sklearn
@@ -71,23 +76,98 @@ from sklearn import base
 import ibex
 
 
-for name in dir(_orig):
-    if name.startswith('_'):
-        continue
+__all__ = [name for name in dir(_orig) if not name.startswith('_')]
+
+
+def __getattr__(name):
+    if name.startswith('_') or not hasattr(_orig, name):
+        raise AttributeError('module %s has no attribute %s' % (__name__, name))
     est = getattr(_orig, name)
     try:
         if inspect.isclass(est) and issubclass(est, base.BaseEstimator):
-            globals()[name] = ibex.frame(est)
-        else:
-            globals()[name] = est
-    except TypeError as e:
-        pass''')
+            est = ibex.frame(est)
+    except TypeError:
+        pass
+    globals()[name] = est
+    return est
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))''')
+
+
+def _cache_dir():
+    """
+    Returns the directory of cached compiled wrapper modules, or ``None`` if caching is disabled.
+
+    The directory is ``$IBEX_CACHE_DIR`` (caching is disabled if it is set but empty), by default
+    ``~/.cache/ibex``, under a subdirectory keyed by the versions of ``sklearn``, ``ibex``, the
+    bytecode format, and the wrapper template; a change to any of these will therefore regenerate
+    the wrappers. Subdirectories of other keys are left alone, as they may be in use by other
+    environments.
+    """
+    root = os.environ.get('IBEX_CACHE_DIR')
+    if root is None:
+        root = os.path.join(os.path.expanduser('~'), '.cache', 'ibex')
+    if not root:
+        return None
+
+    import ibex
+
+    return os.path.join(root, 'sklearn-%s_ibex-%s_%s_%s' % (
+        sklearn.__version__,
+        ibex.__version__,
+        binascii.hexlify(imp.get_magic()).decode('ascii'),
+        hashlib.sha1(_code.template.encode('utf-8')).hexdigest()[: 12]))
+
+
+def _write_cached(f_name, code):
+    dir_name = os.path.dirname(f_name)
+    try:
+        if not os.path.isdir(dir_name):
+            os.makedirs(dir_name)
+        fd, tmp_f_name = tempfile.mkstemp(dir=dir_name)
+        with os.fdopen(fd, 'wb') as f:
+            marshal.dump(code, f)
+        getattr(os, 'replace', os.rename)(tmp_f_name, f_name)
+    except (IOError, OSError):
+        # The cache is an optimization; e.g., a read-only home directory should not fail imports.
+        pass
+
+
+def _compiled_code(mod_name):
+    """
+    Returns the compiled wrapper of :mod:`sklearn.<mod_name>`, from the cache if possible.
+    """
+    cache_dir = _cache_dir()
+    f_name = None if cache_dir is None else os.path.join(cache_dir, mod_name + '.bin')
+
+    if f_name is not None:
+        try:
+            with open(f_name, 'rb') as f:
+                return marshal.load(f)
+        except (IOError, OSError, EOFError, ValueError, TypeError):
+            pass
+
+    code = compile(
+        _code.substitute({'mod_name': mod_name}),
+        '<ibex.sklearn.%s>' % mod_name,
+        'exec')
+
+    if f_name is not None:
+        _write_cached(f_name, code)
+
+    return code
 
 
 class _NewModuleLoader(object):
     """
     Load the requested module via standard import, or create a new module if
     not exist.
+
+    The module's attributes are wrapped lazily, on first access, through
+    a module-level ``__getattr__`` (:pep:`562`), and cached in the module.
+    The compiled module code is cached on disk (see :func:`_cache_dir`).
     """
 
     def load_module(self, full_name):
@@ -100,9 +180,12 @@ class _NewModuleLoader(object):
         mod.__loader__ = self
         mod.__package__ = '.'.join(full_name.split('.')[:-1])
 
-        code = _code.substitute({'mod_name': orig})
+        six.exec_(_compiled_code(orig), mod.__dict__)
 
-        six.exec_(code, mod.__dict__)
+        # Module-level __getattr__ is unsupported before Python 3.7.
+        if sys.version_info < (3, 7):
+            for name in mod.__all__:
+                mod.__getattr__(name)
 
         _model_selection_update_module(orig, mod)
         _pipeline_update_module(orig, mod)
@@ -8,7 +8,8 @@ from sklearn.utils.validation import check_is_fitted
 import pandas as pd
 
 from .._base import FrameMixin
-from .._xy_estimator import make_xy_estimator
+from .._xy_estimator import make_xy_estimator, set_xy_data
+from .._shared import shared_for_jobs
 
 
 def cross_val_predict(
@@ -106,19 +107,24 @@ def cross_val_predict(
 
     """
 
-    est, X_, y_ = make_xy_estimator(estimator, X, y)
-
-    y_hat = _orig.cross_val_predict(
-        est,
-        X_,
-        y_,
-        groups,
-        cv,
-        n_jobs,
-        verbose,
-        fit_params,
-        pre_dispatch,
-        method)
+    # The estimator passed to the workers never pickles the data itself, so any data is shared.
+    with shared_for_jobs(X, n_jobs, 0) as shared_X, shared_for_jobs(y, n_jobs, 0) as shared_y:
+        est, X_, y_ = make_xy_estimator(estimator, shared_X, shared_y)
+
+        try:
+            y_hat = _orig.cross_val_predict(
+                est,
+                X_,
+                y_,
+                groups,
+                cv,
+                n_jobs,
+                verbose,
+                fit_params,
+                pre_dispatch,
+                method)
+        finally:
+            set_xy_data(est, X, y)
 
     if len(y_hat.shape) == 1:
         return pd.Series(y_hat, index=y.index)
@@ -294,10 +300,17 @@ class BaseSearchCV(base.BaseEstimator, FrameMixin):
         """
 
         params = self._cv.get_params()
-        est, X_, y_ = make_xy_estimator(self._estimator, X, y)
-        params.update({'estimator': est})
-        self._cv.set_params(**params)
-        self._cv.fit(X_, y=y_, groups=groups)
+        # The estimator passed to the workers never pickles the data itself, so any data is shared.
+        n_jobs = self._cv.n_jobs
+        with shared_for_jobs(X, n_jobs, 0) as shared_X, shared_for_jobs(y, n_jobs, 0) as shared_y:
+            est, X_, y_ = make_xy_estimator(self._estimator, shared_X, shared_y)
+            params.update({'estimator': est})
+            self._cv.set_params(**params)
+            try:
+                self._cv.fit(X_, y=y_, groups=groups)
+            finally:
+                # The handles are invalid once the context exits; the fitted estimators keep the frames.
+                set_xy_data(est, X, y)
         return self
 
     @property
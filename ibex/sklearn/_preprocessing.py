@@ -2,6 +2,7 @@ from __future__ import absolute_import
 
 
 from .._function_transformer import FunctionTransformer as PDFunctionTransformer
+from .._group_aggregate import GroupAggregateTransformer as PDGroupAggregateTransformer
 
 
 def update_module(name, module):
@@ -9,6 +10,7 @@ def update_module(name, module):
         return
 
     setattr(module, 'FunctionTransformer', PDFunctionTransformer)
+    setattr(module, 'GroupAggregateTransformer', PDGroupAggregateTransformer)
 
 
 
@@ -0,0 +1,171 @@
+"""
+Micro-benchmarks of the overhead Ibex adds on top of the estimators it wraps.
+
+Usage::
+
+    python scripts/benchmark.py [benchmark_name ...]
+
+Runs all benchmarks if no names are given.
+"""
+
+
+from __future__ import print_function
+
+import sys
+import timeit
+import subprocess
+
+import numpy as np
+import pandas as pd
+
+
+def _report(name, raw, wrapped, number):
+    print('%-40s raw %9.1fus  ibex %9.1fus  overhead %9.1fus' % (
+        name,
+        1e6 * raw / number,
+        1e6 * wrapped / number,
+        1e6 * (wrapped - raw) / number))
+
+
+def bench_call_overhead(number=2000):
+    """
+    Per-call overhead of adapted ``predict``/``transform`` on small batches.
+    """
+    from sklearn import linear_model
+    from sklearn import preprocessing
+    from ibex.sklearn import linear_model as pd_linear_model
+    from ibex.sklearn import preprocessing as pd_preprocessing
+
+    for n_rows in [1, 10, 100]:
+        X = pd.DataFrame(np.random.rand(n_rows, 10), columns=['c%d' % i for i in range(10)])
+        y = pd.Series(np.random.rand(n_rows))
+        X_, y_ = X.values, y.values
+
+        raw = linear_model.LinearRegression().fit(X_, y_)
+        wrapped = pd_linear_model.LinearRegression().fit(X, y)
+        _report(
+            'LinearRegression.predict, %d rows' % n_rows,
+            timeit.timeit(lambda: raw.predict(X_), number=number),
+            timeit.timeit(lambda: wrapped.predict(X), number=number),
+            number)
+
+        raw = preprocessing.StandardScaler().fit(X_)
+        wrapped = pd_preprocessing.StandardScaler().fit(X)
+        _report(
+            'StandardScaler.transform, %d rows' % n_rows,
+            timeit.timeit(lambda: raw.transform(X_), number=number),
+            timeit.timeit(lambda: wrapped.transform(X), number=number),
+            number)
+
+
+def bench_wide_frame(number=200):
+    """
+    Overhead of adapted ``predict`` on wide frames, in fit order and permuted.
+    """
+    from sklearn import linear_model
+    from ibex.sklearn import linear_model as pd_linear_model
+
+    n_cols = 2000
+    X = pd.DataFrame(np.random.rand(100, n_cols), columns=['c%d' % i for i in range(n_cols)])
+    y = pd.Series(np.random.rand(100))
+    permuted_X = X[list(reversed(X.columns))]
+    X_ = X.values
+
+    raw = linear_model.LinearRegression().fit(X_, y.values)
+    wrapped = pd_linear_model.LinearRegression().fit(X, y)
+    _report(
+        'LinearRegression.predict, %d cols' % n_cols,
+        timeit.timeit(lambda: raw.predict(X_), number=number),
+        timeit.timeit(lambda: wrapped.predict(X), number=number),
+        number)
+    _report(
+        'LinearRegression.predict, %d cols permuted' % n_cols,
+        timeit.timeit(lambda: raw.predict(X_), number=number),
+        timeit.timeit(lambda: wrapped.predict(permuted_X), number=number),
+        number)
+
+
+def bench_single_record(number=2000):
+    """
+    Latency of predicting a single record, through a frame and through ``predict_record``.
+    """
+    from sklearn import linear_model
+    from ibex.sklearn import linear_model as pd_linear_model
+
+    X = pd.DataFrame(np.random.rand(100, 10), columns=['c%d' % i for i in range(10)])
+    y = pd.Series(np.random.rand(100))
+    record = X.iloc[0].to_dict()
+    x_ = X.values[: 1]
+
+    raw = linear_model.LinearRegression().fit(X.values, y.values)
+    wrapped = pd_linear_model.LinearRegression().fit(X, y)
+    _report(
+        'LinearRegression.predict, 1-row frame',
+        timeit.timeit(lambda: raw.predict(x_), number=number),
+        timeit.timeit(lambda: wrapped.predict(pd.DataFrame([record])), number=number),
+        number)
+    _report(
+        'LinearRegression.predict_record',
+        timeit.timeit(lambda: raw.predict(x_), number=number),
+        timeit.timeit(lambda: wrapped.predict_record(record), number=number),
+        number)
+
+
+def bench_specialized(number=2000):
+    """
+    Per-call overhead of specialized wrapped methods (see ``generate.py``), against the generic ones.
+    """
+    from sklearn import linear_model
+    from ibex._adapter import _make_frame_class, _specialized_methods
+
+    if _specialized_methods(linear_model.LinearRegression) is None:
+        print('No specialized adapters for this sklearn version; run generate.py')
+        return
+
+    X = pd.DataFrame(np.random.rand(10, 10), columns=['c%d' % i for i in range(10)])
+    y = pd.Series(np.random.rand(10))
+
+    generic = _make_frame_class(linear_model.LinearRegression, specialize=False)().fit(X, y)
+    specialized = _make_frame_class(linear_model.LinearRegression)().fit(X, y)
+    _report(
+        'LinearRegression.fit, specialized',
+        timeit.timeit(lambda: generic.fit(X, y), number=number),
+        timeit.timeit(lambda: specialized.fit(X, y), number=number),
+        number)
+    _report(
+        'LinearRegression.predict, specialized',
+        timeit.timeit(lambda: generic.predict(X), number=number),
+        timeit.timeit(lambda: specialized.predict(X), number=number),
+        number)
+
+
+def bench_import_time(number=5):
+    """
+    Time to start an interpreter and import a wrapped module (and use a single class of it).
+    """
+    def run(stmt):
+        return min(
+            timeit.timeit(lambda: subprocess.check_call([sys.executable, '-c', stmt]), number=1)
+            for _ in range(number))
+
+    for mod_name, cls_name in [('ensemble', 'RandomForestClassifier'), ('linear_model', 'LinearRegression')]:
+        _report(
+            'import %s' % mod_name,
+            run('from sklearn import %s; %s.%s' % (mod_name, mod_name, cls_name)),
+            run('import ibex; from ibex.sklearn import %s; %s.%s' % (mod_name, mod_name, cls_name)),
+            1)
+
+
+_benchmarks = {
+    'call_overhead': bench_call_overhead,
+    'wide_frame': bench_wide_frame,
+    'single_record': bench_single_record,
+    'import_time': bench_import_time,
+    'specialized': bench_specialized,
+}
+
+
+if __name__ == '__main__':
+    names = sys.argv[1:] if len(sys.argv) > 1 else sorted(_benchmarks)
+    for name in names:
+        _benchmarks[name]()
@@ -1,4 +1,25 @@
+"""
+Generates code from the templates in this directory.
+
+Usage::
+
+    python scripts/generate.py [target ...]
+
+where each target is one of:
+
+    * ``specialized`` (the default) - ``ibex/_specialized.py``, holding, for each estimator class of
+        the installed sklearn, wrapped methods whose argument handling is fixed by the signatures of
+        the methods they wrap. :func:`ibex.frame` uses these (instead of the generic ones) only under
+        the same sklearn version. ``setup.py`` runs this on building, so that the module matches
+        the sklearn installed alongside; it is not kept in the repository.
+
+    * ``adapter`` - ``ibex/_adapter.py``, from ``_adapter.py.jinja2``.
+"""
+
+
 import os
+import sys
+import math
 import importlib
 import inspect
 
@@ -7,37 +28,144 @@ import sklearn
 from sklearn import base
 import jinja2
 
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+from ibex._adapter import _wrapped, _batched
+
 
-m_names = set()
-for mod_name in sklearn.__all__:
-    import_str = 'from sklearn import %s as _orig' % mod_name
-    exec(import_str)
-    for name in dir(_orig):
-        c = getattr(_orig, name)
+# Wrapped methods returning scalars, whose results need no conversion.
+_scalar = ['score', 'aic', 'bic', 'perplexity']
+
+
+def _scan():
+    """
+    Returns the estimator classes of the installed sklearn, by qualified name, and the names of
+    the methods they have taking ``X``.
+    """
+    m_names = set()
+    classes = {}
+    for mod_name in sklearn.__all__:
         try:
-            if not issubclass(c, base.BaseEstimator):
-                continue
-        except TypeError:
+            _orig = importlib.import_module('sklearn.' + mod_name)
+        except ImportError:
             continue
-        for m_name in c.__dict__:
-            if m_name.startswith('_'):
-                continue
-            if m_name == 'score':
+        for name in dir(_orig):
+            c = getattr(_orig, name)
+            try:
+                if not issubclass(c, base.BaseEstimator):
+                    continue
+            except TypeError:
                 continue
-            m = getattr(c, m_name)
-            if not six.callable(m):
-                continue
-            sig = inspect.signature(m)
-            params = list(sig.parameters)
-            if params[: 2] != ['self', 'X']:
-                continue
-            # print(name, c, m_name, params)
-            m_names.add(m_name)
-
-loader = jinja2.FileSystemLoader(os.path.dirname(__file__))
-env = jinja2.Environment(loader=loader)
-tmpl = env.get_template('_adapter.py.jinja2')
-cnt =tmpl.render(
-	comment='# Auto generted from _adapter.py.jinja2',
-	m_names=m_names)
-open(os.path.join(os.path.dirname(__file__), '../ibex/_adapter.py'), 'w').write(cnt)
+            if not name.startswith('_'):
+                classes[c.__module__ + '.' + c.__name__] = c
+            for m_name in c.__dict__:
+                if m_name.startswith('_'):
+                    continue
+                if m_name == 'score':
+                    continue
+                m = getattr(c, m_name)
+                if not six.callable(m):
+                    continue
+                try:
+                    sig = inspect.signature(m)
+                except (TypeError, ValueError):
+                    continue
+                params = list(sig.parameters)
+                if params[: 2] != ['self', 'X']:
+                    continue
+                m_names.add(m_name)
+    return classes, m_names
+
+
+def _literal(value):
+    if isinstance(value, tuple):
+        return all(_literal(v) for v in value)
+    if isinstance(value, float):
+        return not math.isinf(value) and not math.isnan(value)
+    return value is None or isinstance(value, (bool, int) + six.string_types)
+
+
+def _specialized_method(c, m_name):
+    """
+    Returns the template context of a specialized wrapped method ``m_name`` of ``c``.
+    """
+    try:
+        params = list(inspect.signature(getattr(c, m_name)).parameters.values())[2:]
+    except (TypeError, ValueError):
+        params = None
+
+    fixed = params is not None and all(
+        p.kind == p.VAR_KEYWORD or
+        p.kind == p.POSITIONAL_OR_KEYWORD and (p.default is p.empty or _literal(p.default))
+        for p in params)
+    if not fixed:
+        # Falls back to generic argument handling (but still with no per-call introspection).
+        return {
+            'name': m_name,
+            'params': ', *args, **kwargs',
+            'args': 'args',
+            'kwargs': 'kwargs',
+            'y': "(args[0] if args else kwargs.get('y'))"
+                if params and params[0].name == 'y' else 'None',
+            'sample_weight': 'None',
+            'wrap_res': m_name not in _scalar,
+        }
+
+    names = [p.name for p in params if p.kind == p.POSITIONAL_OR_KEYWORD]
+    decls = [
+        p.name if p.default is p.empty else '%s=%r' % (p.name, p.default)
+        for p in params if p.kind == p.POSITIONAL_OR_KEYWORD]
+    var_kwargs = [p.name for p in params if p.kind == p.VAR_KEYWORD]
+    if not var_kwargs and m_name in _batched:
+        var_kwargs = ['kwargs']
+    decls += ['**' + n for n in var_kwargs]
+    return {
+        'name': m_name,
+        'params': ''.join(', ' + d for d in decls),
+        'args': '(%s,)' % names[0] if len(names) == 1 else '(%s)' % ', '.join(names),
+        'kwargs': var_kwargs[0] if var_kwargs else '{}',
+        'y': 'y' if names[: 1] == ['y'] else 'None',
+        'sample_weight': 'sample_weight' if 'sample_weight' in names else 'None',
+        'wrap_res': m_name not in _scalar,
+    }
+
+
+def _specialized_context(classes):
+    ctx = []
+    for key in sorted(classes):
+        c = classes[key]
+        ctx.append({
+            'key': key,
+            'factory': '_' + key.replace('.', '_'),
+            'methods': [_specialized_method(c, m_name) for m_name in _wrapped if hasattr(c, m_name)],
+        })
+    return ctx
+
+
+env = jinja2.Environment(loader=jinja2.FileSystemLoader(os.path.dirname(os.path.abspath(__file__))))
+
+
+def render_specialized(classes):
+    """
+    Returns the source of ``ibex/_specialized.py`` for ``classes``, a ``dict`` mapping qualified names
+    to estimator classes.
+    """
+    return env.get_template('_specialized.py.jinja2').render(
+        comment='Auto generated from _specialized.py.jinja2 by generate.py; do not edit.',
+        sklearn_version=sklearn.__version__,
+        classes=_specialized_context(classes))
+
+
+if __name__ == '__main__':
+    targets = sys.argv[1:] if len(sys.argv) > 1 else ['specialized']
+    classes, m_names = _scan()
+
+    if 'adapter' in targets:
+        tmpl = env.get_template('_adapter.py.jinja2')
+        cnt = tmpl.render(
+            comment='# Auto generted from _adapter.py.jinja2',
+            m_names=m_names)
+        open(os.path.join(os.path.dirname(__file__), '../ibex/_adapter.py'), 'w').write(cnt)
+
+    if 'specialized' in targets:
+        open(os.path.join(os.path.dirname(__file__), '../ibex/_specialized.py'), 'w').write(
+            render_specialized(classes))
@@ -1,6 +1,7 @@
 import os
 import sys
 from setuptools import setup, Command
+from setuptools.command.build_py import build_py
 import subprocess
 
 
@@ -42,6 +43,18 @@ class _DocumentCommand(Command):
         subprocess.check_call(run_str.split(' '), cwd='docs')
 
 
+class _BuildPyCommand(build_py):
+    def run(self):
+        # ibex/_specialized.py is generated against the sklearn installed alongside; if it cannot be
+        # (e.g., jinja2 is missing), the generic adapters are used.
+        try:
+            subprocess.check_call(
+                [sys.executable, os.path.join('scripts', 'generate.py'), 'specialized'])
+        except (subprocess.CalledProcessError, OSError) as e:
+            self.warn('could not generate ibex/_specialized.py: %s' % e)
+        build_py.run(self)
+
+
 setup(
     name='ibex',
     version='0.1.0',
@@ -62,6 +75,7 @@ setup(
     },
     include_package_data=True,
     cmdclass={
+        'build_py': _BuildPyCommand,
         'document': _DocumentCommand,
         'test': _TestCommand,
     },
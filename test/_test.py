@@ -5,6 +5,8 @@ import doctest
 import subprocess
 import json
 import pickle
+import runpy
+import types
 
 import six
 from sklearn import preprocessing
@@ -37,6 +39,9 @@ except ImportError:
     _nbconvert = False
 
 from ibex import *
+from ibex import _adapter
+from ibex._adapter import make_adapter
+from ibex._base import _required_columns
 
 
 _this_dir = os.path.dirname(__file__)
@@ -110,6 +115,113 @@ class _BaseTest(unittest.TestCase):
         prd.fit(x, y)
         prd.coef_
 
+    def test_frame_memoized(self):
+        self.assertIs(frame(linear_model.LinearRegression), pd_linear_model.LinearRegression)
+        self.assertIs(type(frame(linear_model.LinearRegression())), pd_linear_model.LinearRegression)
+
+    def test_frame_memoized_threads(self):
+        import threading
+
+        class Est(base.BaseEstimator, base.TransformerMixin):
+            def fit(self, X, y=None):
+                return self
+
+            def transform(self, X):
+                return X
+
+        adapters = []
+        threads = [threading.Thread(target=lambda: adapters.append(frame(Est))) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(len(set(adapters)), 1)
+
+    def test_signature_table(self):
+        signatures = pd_linear_model.LinearRegression._ibex_signatures
+        self.assertEqual(signatures['fit'].y_arg, 0)
+        self.assertEqual(signatures['score'].y_arg, 0)
+        self.assertIsNone(signatures['predict'].y_arg)
+        self.assertNotIn('transform', signatures)
+        self.assertEqual(signatures['fit'].sample_weight_arg, 1)
+
+    def test_mismatched_y_index(self):
+        x = pd.DataFrame({'a': [1, 2, 3]})
+        y = pd.Series([1, 2, 3], index=[1, 2, 3])
+
+        with self.assertRaises(ValueError):
+            pd_linear_model.LinearRegression().fit(x, y)
+
+    def test_sample_weight(self):
+        x = pd.DataFrame({'a': [1, 2, 3]})
+        y = pd.Series([1, 2, 3])
+
+        pd_linear_model.LinearRegression().fit(x, y, sample_weight=pd.Series([1, 2, 1]))
+        with self.assertRaises(ValueError):
+            pd_linear_model.LinearRegression().fit(x, y, sample_weight=pd.Series([1, 2, 1], index=[1, 2, 3]))
+
+    def test_specialized_methods(self):
+        calls = []
+
+        def fit(self, X, y=None):
+            calls.append('fit')
+            return self._ibex_run(super(Adapter, self).fit, 'fit', X, (y,), {}, y)
+
+        Adapter = make_adapter(linear_model.LinearRegression, {'fit': fit})
+        self.assertNotIn('predict', vars(Adapter))
+
+        x = pd.DataFrame({'a': [1, 2, 3]})
+        Adapter().fit(x, pd.Series([1, 2, 3]))
+        self.assertEqual(calls, ['fit'])
+        with self.assertRaises(ValueError):
+            Adapter().fit(x, pd.Series([1, 2, 3], index=[1, 2, 3]))
+
+    def test_specialized_module(self):
+        try:
+            generate = runpy.run_path(os.path.join(_this_dir, '..', 'scripts', 'generate.py'))
+        except ImportError:
+            self.skipTest('jinja2 is not installed')
+
+        est = linear_model.LinearRegression
+        source = generate['render_specialized']({est.__module__ + '.' + est.__name__: est})
+        specialized = types.ModuleType('_specialized')
+        exec(compile(source, '<specialized>', 'exec'), specialized.__dict__)
+
+        orig, _adapter._specialized = _adapter._specialized, specialized
+        try:
+            Adapter = _adapter._make_frame_class(est)
+        finally:
+            _adapter._specialized = orig
+
+        for m_name in ['fit', 'predict']:
+            self.assertEqual(vars(Adapter)[m_name].__code__.co_filename, '<specialized>')
+        x = pd.DataFrame({'a': [1, 2, 3]}, index=[4, 5, 6])
+        y = pd.Series([2, 4, 6], index=x.index)
+        y_hat = Adapter().fit(x, y).predict(x)
+        self.assertTrue(y_hat.index.equals(x.index))
+        np.testing.assert_allclose(y_hat.values, y.values)
+
+    def test_frame_input(self):
+        class Est(base.BaseEstimator, base.TransformerMixin, FrameMixin):
+            """
+            Records the types of the inputs it transforms.
+            """
+            def fit(self, X, y=None):
+                return self
+
+            def transform(self, X):
+                self.types_ = getattr(self, 'types_', []) + [type(X)]
+                return X
+
+        self.assertTrue(make_adapter(preprocessing.StandardScaler)._ibex_array_input)
+        Adapter = make_adapter(Est)
+        self.assertFalse(Adapter._ibex_array_input)
+
+        x = pd.DataFrame({'a': [1, 2, 3]})
+        est = Adapter().fit(x)
+        self.assertTrue(est.transform(x).equals(x))
+        self.assertEqual(est.types_, [pd.DataFrame])
+
 
 class _FrameTest(unittest.TestCase):
     def test_fit(self):
@@ -172,6 +284,17 @@ class _FrameTest(unittest.TestCase):
         self.assertFalse(isinstance(y_hat, pd.Series))
         np.testing.assert_equal(pd_y_hat, y_hat)
 
+    def test_fit_permute_cols_transform(self):
+        X = pd.DataFrame({'a': [1, 2, 3], 'b': [30, 23, 2]})
+
+        trn = pd_preprocessing.StandardScaler().fit(X)
+
+        Xt = trn.transform(X)
+        permuted_Xt = trn.transform(X[['b', 'a']])
+        self.assertEqual(list(permuted_Xt.columns), ['a', 'b'])
+        self.assertTrue(Xt.equals(permuted_Xt))
+        self.assertTrue(trn.transform(X[['b', 'a']]).equals(Xt))
+
     def test_fit_bad_cols(self):
         X = pd.DataFrame({'a': [1, 2, 3], 'b': [30, 23, 2]})
         y = pd.Series([1, 2, 3])
@@ -201,6 +324,252 @@ class _FrameTest(unittest.TestCase):
             pred.predict(X)
 
 
+class _ConversionTest(unittest.TestCase):
+    def test_dtype_policy(self):
+        X = pd.DataFrame({'a': [1, 2, 3], 'b': [30., 23., 2.]})
+
+        Xt = pd_preprocessing.StandardScaler().fit_transform(X)
+        self.assertEqual(Xt.values.dtype, np.float64)
+
+        with dtype_policy(np.float32):
+            Xt = pd_preprocessing.StandardScaler().fit_transform(X)
+        self.assertEqual(Xt.values.dtype, np.float32)
+
+    def test_no_copy_homogeneous(self):
+        X = pd.DataFrame(np.random.rand(10, 3), columns=['a', 'b', 'c'])
+
+        trn = pd_preprocessing.StandardScaler().fit(X)
+        reset_conversion_stats()
+        trn.transform(X)
+        stats = conversion_stats()
+        self.assertEqual(stats['conversions'], 1)
+        self.assertEqual(stats['copied_bytes'], 0)
+
+    def test_copy_counted(self):
+        X = pd.DataFrame({'a': [1, 2, 3], 'b': [30., 23., 2.]})
+
+        trn = pd_preprocessing.StandardScaler().fit(X)
+        reset_conversion_stats()
+        trn.transform(X)
+        self.assertEqual(conversion_stats()['copied_bytes'], 3 * 2 * 8)
+
+
+def _to_dense(X):
+    # The accessor densifies by column label, so the (duplicate) blank labels are replaced by positions.
+    return X.set_axis(range(X.shape[1]), axis=1).sparse.to_dense()
+
+
+class _SparseTest(unittest.TestCase):
+    def test_sparse_output(self):
+        X = pd.DataFrame({'a': [0, 1, 2, 1], 'b': [1, 0, 1, 1]}, index=[3, 4, 5, 6])
+
+        Xt = pd_preprocessing.OneHotEncoder().fit_transform(X)
+        self.assertIsInstance(Xt, pd.DataFrame)
+        self.assertEqual(Xt.shape, (4, 5))
+        self.assertListEqual(list(Xt.index), list(X.index))
+        np.testing.assert_equal(
+            _to_dense(Xt).values,
+            preprocessing.OneHotEncoder().fit_transform(X).toarray())
+
+    def test_sparse_input(self):
+        X = pd.DataFrame({'a': [0, 1, 2, 1], 'b': [1, 0, 1, 1]}, index=[3, 4, 5, 6])
+        y = pd.Series([1., 2., 3., 2.], index=X.index)
+
+        Xt = pd_preprocessing.OneHotEncoder().fit_transform(X)
+        y_hat = pd_linear_model.LinearRegression().fit(Xt, y).predict(Xt)
+        self.assertIsInstance(y_hat, pd.Series)
+        self.assertListEqual(list(y_hat.index), list(X.index))
+        dense_y_hat = pd_linear_model.LinearRegression().fit(_to_dense(Xt), y).predict(_to_dense(Xt))
+        np.testing.assert_almost_equal(y_hat.values, dense_y_hat.values)
+
+
+class _BatchTest(unittest.TestCase):
+    def test_batch_size(self):
+        iris, features = _load_iris()
+
+        clf = pd_linear_model.LogisticRegression().fit(iris[features], iris['class'])
+
+        self.assertTrue(clf.predict(iris[features], batch_size=7).equals(clf.predict(iris[features])))
+        self.assertTrue(clf.predict_proba(iris[features], batch_size=7).equals(clf.predict_proba(iris[features])))
+
+        trn = pd_preprocessing.StandardScaler().fit(iris[features])
+        self.assertTrue(trn.transform(iris[features], batch_size=1000).equals(trn.transform(iris[features])))
+
+        with self.assertRaises(ValueError):
+            trn.transform(iris[features], batch_size=0)
+
+        # Other methods are passed the keyword as it is, and sklearn's reject it.
+        with self.assertRaises(TypeError):
+            clf.score(iris[features], iris['class'], batch_size=5)
+        with self.assertRaises(TypeError):
+            pd_linear_model.LogisticRegression().fit(iris[features], iris['class'], batch_size=5)
+
+    def test_iter(self):
+        iris, features = _load_iris()
+
+        clf = pd_linear_model.LogisticRegression().fit(iris[features], iris['class'])
+
+        chunks = (iris[features].iloc[i: i + 40] for i in range(0, len(iris), 40))
+        y_hats = list(clf.predict_iter(chunks))
+        self.assertEqual(len(y_hats), 4)
+        self.assertTrue(pd.concat(y_hats).equals(clf.predict(iris[features])))
+
+        self.assertFalse(hasattr(clf, 'transform_iter'))
+        self.assertFalse(hasattr(pd_linear_model.LinearRegression(), 'predict_proba_iter'))
+
+    def test_pipeline(self):
+        iris, features = _load_iris()
+
+        clf = pd_preprocessing.StandardScaler() | pd_linear_model.LogisticRegression()
+        clf.fit(iris[features], iris['class'])
+
+        y_hat = clf.predict(iris[features])
+        self.assertTrue(clf.predict(iris[features], batch_size=7).equals(y_hat))
+        chunks = (iris[features].iloc[i: i + 40] for i in range(0, len(iris), 40))
+        self.assertTrue(pd.concat(clf.predict_iter(chunks)).equals(y_hat))
+
+
+class _ParallelPredictTest(unittest.TestCase):
+    def test_adapter(self):
+        iris, features = _load_iris()
+        X = iris[features].sample(frac=1)
+
+        clf = pd_linear_model.LogisticRegression().fit(X, iris['class'].loc[X.index])
+
+        y_hat = clf.predict(X)
+        self.assertTrue(clf.predict(X, n_jobs=3).equals(y_hat))
+        self.assertTrue(clf.predict(X, n_jobs=3, batch_size=7).equals(y_hat))
+        self.assertTrue(clf.predict(X, n_jobs=2, backend='multiprocessing').equals(y_hat))
+        self.assertTrue(clf.predict_proba(X, n_jobs=-1).equals(clf.predict_proba(X)))
+
+    def test_pipeline(self):
+        iris, features = _load_iris()
+
+        clf = pd_preprocessing.StandardScaler() | pd_linear_model.LogisticRegression()
+        clf.fit(iris[features], iris['class'])
+
+        y_hat = clf.predict(iris[features])
+        self.assertTrue(clf.predict(iris[features], n_jobs=4).equals(y_hat))
+        self.assertTrue(clf.predict(iris[features], n_jobs=2, backend='multiprocessing').equals(y_hat))
+
+    def test_bad_backend(self):
+        iris, features = _load_iris()
+
+        clf = pd_linear_model.LogisticRegression().fit(iris[features], iris['class'])
+
+        with self.assertRaises(ValueError):
+            clf.predict(iris[features], n_jobs=2, backend='foo')
+
+    def test_other_methods(self):
+        iris, features = _load_iris()
+
+        clf = pd_linear_model.LogisticRegression().fit(iris[features], iris['class'])
+
+        with self.assertRaises(TypeError):
+            clf.score(iris[features], iris['class'], n_jobs=2)
+        with self.assertRaises(TypeError):
+            pd_linear_model.LogisticRegression().fit(iris[features], iris['class'], n_jobs=2)
+
+
+class _SharedTest(unittest.TestCase):
+    def test_frame(self):
+        from ibex._shared import shared, attach
+
+        X = pd.DataFrame(
+            {'a': [1., 2., 3.], 'b': ['x', 'y', 'z'], 'c': [1, 2, 3]},
+            index=[10, 20, 30],
+            columns=['a', 'b', 'c'])
+
+        with shared(X, min_nbytes=0) as handle:
+            self.assertTrue(attach(pickle.loads(pickle.dumps(handle))).equals(X))
+            self.assertTrue(attach(pickle.loads(pickle.dumps(handle))).index.equals(X.index))
+        self.assertFalse(os.path.exists(handle.directory))
+
+    def test_series(self):
+        from ibex._shared import shared, attach
+
+        y = pd.Series([1., 2., 3.], name='y')
+
+        with shared(y, min_nbytes=0) as handle:
+            self.assertTrue(attach(pickle.loads(pickle.dumps(handle))).equals(y))
+        with shared(y) as handle:
+            self.assertIs(handle, y)
+
+    def test_feature_union(self):
+        X = pd.DataFrame(np.random.rand(50000, 4), columns=list('abcd'))
+
+        trn = pd_pipeline.FeatureUnion(
+            [('std', pd_preprocessing.StandardScaler()), ('abs', pd_preprocessing.MaxAbsScaler())],
+            n_jobs=2)
+        Xt = trn.fit_transform(X)
+
+        trn = pd_preprocessing.StandardScaler() + pd_preprocessing.MaxAbsScaler()
+        np.testing.assert_array_almost_equal(Xt.values, trn.fit_transform(X).values)
+
+    def test_xy_estimator(self):
+        from ibex._shared import shared, SharedFrame
+        from ibex._xy_estimator import make_xy_estimator, set_xy_data
+
+        X = pd.DataFrame(np.random.rand(10000, 4), columns=list('abcd'))
+
+        est, _, _ = make_xy_estimator(pd_linear_model.LinearRegression(), X)
+        self.assertLess(len(pickle.dumps(est)), X.values.nbytes // 10)
+
+        with shared(X, min_nbytes=0) as handle:
+            est, _, _ = make_xy_estimator(pd_linear_model.LinearRegression(), handle)
+            self.assertIsInstance(type(pickle.loads(pickle.dumps(est)))._ibex_data[0], SharedFrame)
+            refit = base.clone(est)
+            set_xy_data(est, X)
+        self.assertIs(type(refit)._ibex_data[0], X)
+
+
+class _RecordTest(unittest.TestCase):
+    def test_adapter(self):
+        iris, features = _load_iris()
+
+        clf = pd_linear_model.LogisticRegression().fit(iris[features], iris['class'])
+
+        records = iris[features].to_dict('records')
+        y_hat = clf.predict(iris[features])
+        self.assertEqual(clf.predict_records(records), list(y_hat))
+        self.assertEqual(clf.predict_record(records[0]), y_hat.iloc[0])
+        self.assertIsInstance(clf.predict_record(records[0]), float)
+
+        with self.assertRaises(KeyError):
+            clf.predict_record({features[0]: 1.})
+
+    def test_pipeline(self):
+        iris, features = _load_iris()
+
+        clf = pd_preprocessing.StandardScaler() | pd_linear_model.LogisticRegression()
+        clf.fit(iris[features], iris['class'])
+
+        records = iris[features].to_dict('records')
+        y_hat = clf.predict(iris[features])
+        self.assertEqual(clf.predict_records(records), list(y_hat))
+        self.assertEqual(clf.predict_record(records[-1]), y_hat.iloc[-1])
+
+    def test_pipeline_frame_step(self):
+        iris, features = _load_iris()
+
+        clf = trans(None, features[: 2]) | pd_linear_model.LinearRegression()
+        clf.fit(iris[features], iris['class'])
+
+        records = iris[features].to_dict('records')
+        np.testing.assert_almost_equal(clf.predict_records(records), clf.predict(iris[features]).values)
+
+    def test_pipeline_mixed_dtypes(self):
+        X = pd.DataFrame({'a': [1, 2, 1, 3], 'b': ['x', 'y', 'x', 'y']}, columns=['a', 'b'])
+        y = pd.Series([1., 2., 1., 4.])
+
+        clf = pd_preprocessing.OneHotEncoder() | pd_linear_model.LinearRegression()
+        clf.fit(X, y)
+
+        records = X.to_dict('records')
+        np.testing.assert_almost_equal(clf.predict_records(records), clf.predict(X).values)
+        np.testing.assert_almost_equal(clf.predict_record(records[-1]), clf.predict(X).iloc[-1])
+
+
 class _FramePipelineTest(unittest.TestCase):
     def test_pipeline_fit(self):
         X = pd.DataFrame({'a': [1, 2, 3]})
@@ -227,6 +596,60 @@ class _FramePipelineTest(unittest.TestCase):
     def test_make_pipeline(self):
         p = pd_pipeline.make_pipeline(pd_preprocessing.StandardScaler(), pd_linear_model.LinearRegression())
 
+    def test_array_steps(self):
+        iris, features = _load_iris()
+        X, y = iris[features], iris['class']
+
+        def steps():
+            return [
+                pd_preprocessing.StandardScaler(),
+                pd_decomposition.PCA(n_components=3, random_state=0),
+                pd_preprocessing.MinMaxScaler(),
+                trans(np.square),
+                pd_preprocessing.MaxAbsScaler(),
+                pd_linear_model.LogisticRegression(),
+            ]
+
+        def transform(steps, X):
+            for step in steps:
+                X = step.transform(X)
+            return X
+
+        expected = steps()
+        Xt = X
+        for step in expected[: -1]:
+            Xt = step.fit_transform(Xt, y)
+        expected[-1].fit(Xt, y)
+
+        clf = pd_pipeline.make_pipeline(*steps())
+        self.assertListEqual(clf._elisions(), [True, True, False, False, True, False])
+        clf.fit(X, y)
+        for (_, step), expected_step in zip(clf.steps, expected):
+            if hasattr(expected_step, 'x_columns'):
+                self.assertIsInstance(step.x_columns, pd.Index)
+                self.assertListEqual(list(step.x_columns), list(expected_step.x_columns))
+
+        Xt = transform(expected[: -1], X)
+        # Steps fitted on arrays within the pipeline also work on their own.
+        self.assertTrue(transform([step for _, step in clf.steps[: -1]], X).equals(Xt))
+        self.assertTrue(clf.predict(X).equals(expected[-1].predict(Xt)))
+        self.assertTrue(clf.predict_proba(X).equals(expected[-1].predict_proba(Xt)))
+        self.assertEqual(clf.score(X, y), expected[-1].score(Xt, y))
+
+        trn = pd_pipeline.make_pipeline(*steps()[: -1])
+        self.assertTrue(trn.fit_transform(X, y).equals(Xt))
+        reset_conversion_stats()
+        self.assertTrue(trn.transform(X).equals(Xt))
+        self.assertEqual(conversion_stats()['conversions'], 2)
+
+
+_doubled_calls = []
+
+
+def _doubled(X):
+    _doubled_calls.append(len(X))
+    return X * 2
+
 
 class _TransTest(unittest.TestCase):
     def test_trans_none(self):
@@ -298,6 +721,140 @@ class _TransTest(unittest.TestCase):
         trans(pd_preprocessing.StandardScaler()).fit(X).fit_transform(X)
         trans(pd_preprocessing.StandardScaler()).fit(X).fit_transform(X, X.a)
 
+    def test_trans_relabel(self):
+        X = pd.DataFrame({'a': [1., 2., 3.], 'b': [30., 23., 2.]})
+
+        values = np.ones((3, 2))
+        res = trans(lambda X: values, out_cols=['c', 'd']).fit(X).transform(X)
+        self.assertListEqual(list(res.columns), ['c', 'd'])
+        self.assertTrue(res.index.equals(X.index))
+        self.assertTrue(np.shares_memory(res.values, values))
+
+        res = trans(np.sqrt, 'b', 'c').fit_transform(X)
+        self.assertListEqual(list(res.columns), ['c'])
+        np.testing.assert_array_almost_equal(res.c.values, np.sqrt(X.b.values))
+
+        trn = trans(None, 'a', 'c').fit(X)
+        trn.set_params(out_cols='d')
+        self.assertListEqual(list(trn.transform(X).columns), ['c'])
+        self.assertListEqual(list(trn.fit(X).transform(X).columns), ['d'])
+
+    def test_trans_n_jobs(self):
+        from ibex import _parallel
+        from ibex._parallel import persistent_pool
+
+        X = pd.DataFrame({'a': np.arange(100.), 'b': np.arange(100.) ** 2}, index=np.arange(100)[:: -1])
+
+        expected = trans(np.sqrt).fit_transform(X)
+        for chunk_size in [None, 7]:
+            res = trans(np.sqrt, n_jobs=2, chunk_size=chunk_size).fit(X).transform(X)
+            self.assertTrue(res.equals(expected))
+        self.assertIs(persistent_pool(2), persistent_pool(2))
+
+        # Inputs of fewer rows than workers still use the pool of the requested number of workers.
+        for n in [3, 5, 7]:
+            trans(np.sqrt, n_jobs=8).fit(X.iloc[: n]).transform(X.iloc[: n])
+        self.assertNotIn(3, _parallel._pools)
+        self.assertNotIn(5, _parallel._pools)
+        self.assertIn(8, _parallel._pools)
+
+    def test_trans_expressions(self):
+        X = pd.DataFrame({'a': [1., 2., 4.], 'b': [2., 2., 8.], 'c': [0, 1, 2]})
+
+        trn = trans([('ratio', 'a / b'), ('log_a', 'log(a) - c')])
+        self.assertListEqual(trn.get_feature_names(), ['ratio', 'log_a'])
+        self.assertListEqual(_required_columns(trn, False), ['a', 'b', 'c'])
+        res = trn.fit_transform(X)
+        self.assertListEqual(list(res.columns), ['ratio', 'log_a'])
+        np.testing.assert_array_almost_equal(res.ratio.values, X.a.values / X.b.values)
+        np.testing.assert_array_almost_equal(res.log_a.values, np.log(X.a.values) - X.c.values)
+
+        self.assertListEqual(_required_columns(trans({'d': 'b - a'}), False), ['b', 'a'])
+        res = trans({'d': 'b - a'}, out_cols='e').fit(X).transform(X)
+        self.assertListEqual(list(res.columns), ['e'])
+
+        with self.assertRaises(KeyError):
+            trans({'d': 'b - a'}).fit(X[['a']])
+
+    def test_trans_cache(self):
+        X = pd.DataFrame({'a': [1., 2., 4.], 'b': [2., 2., 8.], 'c': [0, 1, 2]})
+
+        del _doubled_calls[:]
+        cache = MemoryCache()
+        trn = trans(_doubled, ['a', 'b'], cache=cache).fit(X)
+        expected = trn.transform(X)
+        self.assertTrue(trn.transform(X.copy()).equals(expected))
+        self.assertTrue(base.clone(trn).fit(X).transform(X.assign(c=3)).equals(expected))
+        self.assertEqual(len(_doubled_calls), 1)
+        self.assertEqual(cache.stats()['hits'], 2)
+
+        trn.transform(X.set_index(X.index + 1))
+        trans(lambda X: X * 3, ['a', 'b'], cache=cache).fit_transform(X)
+        self.assertEqual(len(_doubled_calls), 2)
+        self.assertEqual(cache.stats()['misses'], 3)
+
+        trn = trans({'d': 'b - a'}, cache=cache).fit(X)
+        self.assertTrue(trn.transform(X).equals(trn.transform(X)))
+        self.assertEqual(cache.stats()['hits'], 3)
+        np.testing.assert_array_almost_equal(trn.transform(X).d.values, X.b.values - X.a.values)
+
+        # Weighing (in place, where possible) results found in the cache leaves the stored ones intact.
+        cache = MemoryCache()
+        for _ in range(3):
+            feat_un = pd_pipeline.FeatureUnion(
+                [('1', trans(np.sqrt, cache=cache)), ('2', trans(np.square))],
+                transformer_weights={'1': 10})
+            Xt = feat_un.fit_transform(X[['a']])
+            np.testing.assert_array_almost_equal(Xt.values[:, 0], 10 * np.sqrt(X.a.values))
+        self.assertEqual(cache.stats()['hits'], 2)
+
+
+class _GroupAggregateTest(unittest.TestCase):
+    def _X(self, n, seed):
+        rng = np.random.RandomState(seed)
+        X = pd.DataFrame({
+            'u': rng.randint(0, 10, n),
+            'v': rng.randint(0, 2, n),
+            'r': rng.rand(n),
+            's': rng.randint(0, 5, n)})
+        X.loc[X.index[:: 7], 'r'] = np.nan
+        return X
+
+    def test_fit(self):
+        X = self._X(200, 0)
+        aggs = ['count', 'sum', 'mean', 'var', 'std', 'min', 'max']
+
+        trn = pd_preprocessing.GroupAggregateTransformer(['u', 'v'], aggs=aggs)
+        res = trn.fit_transform(X)
+        grouped = X.groupby(['u', 'v'])
+        for c in ['r', 's']:
+            for agg in aggs:
+                np.testing.assert_array_almost_equal(
+                    res['%s_%s' % (c, agg)].values,
+                    grouped[c].transform(agg).values.astype(float))
+
+        X_new = pd.DataFrame({'u': [0, 100], 'v': [0, 0], 'r': [0., 0.], 's': [0, 0]}, index=[5, 6])
+        res = trn.set_params(fill_value=-1).fit(X).transform(X_new)
+        self.assertTrue(res.index.equals(X_new.index))
+        self.assertTrue((res.iloc[1] == -1).all())
+
+        with self.assertRaises(exceptions.NotFittedError):
+            pd_preprocessing.GroupAggregateTransformer('u').transform(X)
+        with self.assertRaises(ValueError):
+            pd_preprocessing.GroupAggregateTransformer('u', aggs='median').fit(X)
+
+    def test_partial_fit(self):
+        X, X_more = self._X(200, 0), self._X(50, 1)
+        X_more['u'] += 5
+
+        trn = pd_preprocessing.GroupAggregateTransformer('u', 'r', ['mean', 'std', 'min', 'max', 'count'])
+        trn.partial_fit(X).partial_fit(X_more)
+        expected = pd_preprocessing.GroupAggregateTransformer('u', 'r', ['mean', 'std', 'min', 'max', 'count']) \
+            .fit(pd.concat([X, X_more]))
+        np.testing.assert_array_almost_equal(trn.table_.values, expected.table_.values)
+        self.assertTrue(trn.table_.index.equals(expected.table_.index))
+        self.assertListEqual(_required_columns(trn, False), ['u', 'r'])
+
 
 class _IrisTest(unittest.TestCase):
     def test_fit_transform(self):
@@ -460,6 +1017,304 @@ class _FeatureUnionTest(unittest.TestCase):
         self.assertEqual(Xt3.shape, (len(X), 2))
         self.assertListEqual(list(Xt3.index), list(X.index))
 
+    def test_weights(self):
+        X = pd.DataFrame({'a': [1, 2, 3], 'b': [3., 4., 5.]})
+
+        feat_un = pd_pipeline.FeatureUnion(
+            [('1', trans(None, 'a')), ('2', trans(None, 'b'))],
+            transformer_weights={'1': 2, '2': 0.5})
+
+        Xt = feat_un.fit_transform(X)
+        np.testing.assert_equal(Xt.values, np.c_[2 * X.a.values, 0.5 * X.b.values])
+        Xt = feat_un.transform(X)
+        np.testing.assert_equal(Xt.values, np.c_[2 * X.a.values, 0.5 * X.b.values])
+        np.testing.assert_equal(X.values, np.c_[[1, 2, 3], [3., 4., 5.]])
+
+        X = pd.DataFrame({'a': [1., 2., 3.], 'b': [3., 4., 5.]})
+        self.assertIsNot(trans().fit(X).transform(X), X)
+
+        feat_un = pd_pipeline.FeatureUnion(
+            [('1', trans(None)), ('2', trans(np.sqrt))],
+            transformer_weights={'1': 2})
+        expected = np.c_[2 * X.values, np.sqrt(X.values)]
+        np.testing.assert_equal(feat_un.fit_transform(X).values, expected)
+        np.testing.assert_equal(feat_un.transform(X).values, expected)
+        np.testing.assert_equal(X.values, np.c_[[1., 2., 3.], [3., 4., 5.]])
+
+    def test_column_pushdown(self):
+        X = pd.DataFrame({'a': [1., 2., 3.], 'b': [3., 4., 5.], 'c': [0., 1., 0.]}, columns=['a', 'b', 'c'])
+        y = pd.Series([1., 2., 4.])
+
+        trn = trans(None, 'b') + trans(None, 'a')
+        self.assertEqual(_required_columns(trn, fitted=False), ['b', 'a'])
+
+        Xt = trn.fit_transform(X)
+        self.assertEqual(list(trn.transformer_list[0][1].x_columns), ['b'])
+        pd.testing.assert_frame_equal(trn.transform(X), Xt)
+
+        clf = trn | pd_linear_model.LinearRegression()
+        clf.fit(X, y)
+        X['d'] = 1.
+        self.assertEqual(len(clf.predict(X)), len(X))
+
+    def test_preallocated_transform(self):
+        X = pd.DataFrame({'a': [1., 2., 3.], 'b': [3., 4., 5.]})
+
+        feat_un = pd_pipeline.FeatureUnion(
+            [('std', pd_preprocessing.StandardScaler()), ('abs', pd_preprocessing.MaxAbsScaler())],
+            transformer_weights={'abs': 2})
+
+        Xt = feat_un.fit_transform(X)
+        self.assertIsNotNone(feat_un._ibex_layout)
+        pd.testing.assert_frame_equal(feat_un.transform(X), Xt)
+        self.assertEqual(list(feat_un.transform(X).columns), ['a', 'b', 'a', 'b'])
+
+        X = X.astype(np.float32)
+        Xt = feat_un.transform(X)
+        self.assertEqual(list(Xt.dtypes), [np.float32] * 4)
+        self.assertEqual(list(Xt.columns), ['a', 'b', 'a', 'b'])
+
+        X = pd.DataFrame({'a': [1, 2, 3], 'b': [3, 4, 5]})
+        feat_un = pd_pipeline.FeatureUnion(
+            [('1', trans(None, 'a')), ('2', trans(None, 'b'))],
+            transformer_weights={'1': 2., '2': 0.5})
+        Xt = feat_un.fit_transform(X)
+        self.assertEqual(feat_un._ibex_layout, ([1, 1], np.float64))
+        np.testing.assert_equal(Xt.values, np.c_[2 * X.a.values, 0.5 * X.b.values])
+        pd.testing.assert_frame_equal(feat_un.transform(X), Xt)
+
+        # Fitting alone does not transform, so the layout is learned by the first transform.
+        feat_un.fit(X)
+        self.assertNotIn('_ibex_layout', feat_un.__dict__)
+        pd.testing.assert_frame_equal(feat_un.transform(X), Xt)
+        self.assertEqual(feat_un._ibex_layout, ([1, 1], np.float64))
+
+
+class _FeatureUnionFitTest(unittest.TestCase):
+    class _Failing(base.BaseEstimator, base.TransformerMixin, FrameMixin):
+        def fit(self, X, y=None):
+            raise ValueError('failing')
+
+        def transform(self, X):
+            return X
+
+    def test_parallel_fit_state(self):
+        X = pd.DataFrame(np.random.rand(100, 2), columns=['a', 'b'])
+
+        for n_jobs in [1, 2]:
+            trn = pd_pipeline.FeatureUnion(
+                [('std', pd_preprocessing.StandardScaler()), ('abs', pd_preprocessing.MaxAbsScaler())],
+                n_jobs=n_jobs)
+            Xt = trn.fit_transform(X)
+            pd.testing.assert_frame_equal(trn.transform(X), Xt)
+
+            trn = pd_pipeline.FeatureUnion(
+                [('std', pd_preprocessing.StandardScaler()), ('abs', pd_preprocessing.MaxAbsScaler())],
+                n_jobs=n_jobs)
+            pd.testing.assert_frame_equal(trn.fit(X).transform(X), Xt)
+
+    def test_failed_branch(self):
+        X = pd.DataFrame(np.random.rand(100, 2), columns=['a', 'b'])
+
+        trn = pd_pipeline.FeatureUnion(
+            [('failing', self._Failing()), ('std', pd_preprocessing.StandardScaler())],
+            n_jobs=2)
+        with self.assertRaises(FeatureUnionFitError) as cm:
+            trn.fit(X)
+        self.assertEqual([e[0] for e in cm.exception.errors], ['failing'])
+        self.assertIsInstance(cm.exception.errors[0][1], ValueError)
+        trn.transformer_list[1][1].transform(X)
+
+
+class _FeatureUnionPrefixTest(unittest.TestCase):
+    class _Counting(base.BaseEstimator, base.TransformerMixin, FrameMixin):
+        fits = 0
+
+        def __init__(self, scale=1):
+            self.scale = scale
+
+        def fit(self, X, y=None):
+            type(self).fits += 1
+            self.x_columns = X.columns
+            self.mean_ = X.mean()
+            return self
+
+        def transform(self, X):
+            return (X[self.x_columns] - self.mean_) * self.scale
+
+    def test_shared_prefix(self):
+        X = pd.DataFrame(np.random.rand(100, 3), columns=['a', 'b', 'c'])
+
+        def branches(scale=1):
+            return [
+                self._Counting() | pd_decomposition.PCA(n_components=2, random_state=0),
+                self._Counting(scale) | pd_preprocessing.MaxAbsScaler(),
+                pd_preprocessing.MaxAbsScaler()]
+
+        self._Counting.fits = 0
+        expected = pd.concat([b.fit_transform(X) for b in branches()], axis=1)
+        self.assertEqual(self._Counting.fits, 2)
+
+        for n_jobs in [1, 2]:
+            trn = pd_pipeline.FeatureUnion(
+                [(str(i), b) for i, b in enumerate(branches())],
+                n_jobs=n_jobs)
+            self._Counting.fits = 0
+            np.testing.assert_array_almost_equal(trn.fit_transform(X).values, expected.values)
+            if n_jobs == 1:
+                self.assertEqual(self._Counting.fits, 1)
+            np.testing.assert_array_almost_equal(trn.transform(X).values, expected.values)
+            np.testing.assert_array_almost_equal(trn.fit(X).transform(X).values, expected.values)
+
+        trn = pd_pipeline.FeatureUnion([(str(i), b) for i, b in enumerate(branches(scale=2))])
+        self._Counting.fits = 0
+        trn.fit(X)
+        self.assertEqual(self._Counting.fits, 2)
+
+
+class _CacheTest(unittest.TestCase):
+    def test_frame_fingerprint(self):
+        X = pd.DataFrame({'a': [1, 2, 3], 'b': [3., 2., 0.]})
+        self.assertEqual(frame_fingerprint(X), frame_fingerprint(X.copy()))
+        self.assertNotEqual(frame_fingerprint(X), frame_fingerprint(X.set_index(X.index + 1)))
+        self.assertNotEqual(frame_fingerprint(X), frame_fingerprint(X.astype(float)))
+        self.assertNotEqual(frame_fingerprint(X), frame_fingerprint(X[['b', 'a']]))
+
+    def test_step_key_class(self):
+        from ibex._cache import step_key
+
+        # Same-named estimators of different modules.
+        ests = [
+            type('Est', (linear_model.LinearRegression, ), {'__module__': m})
+            for m in ['sklearn.a', 'sklearn.b']]
+        keys = [step_key('k', frame(est)()) for est in ests]
+        self.assertNotEqual(keys[0], keys[1])
+        self.assertEqual(keys[0], step_key('k', frame(ests[0])()))
+        self.assertNotEqual(keys[0], step_key('k', ests[0]()))
+
+    def test_eviction(self):
+        import shutil
+        import tempfile
+
+        dir_name = tempfile.mkdtemp()
+        try:
+            cache = ResultCache(dir_name, max_bytes=10 ** 9)
+            for k in 'abc':
+                cache.put(k, np.zeros(1000))
+            size = cache.stats()['bytes'] // 3
+            cache.get('a')
+            cache.max_bytes = 3 * size - 1
+            cache.put('d', np.zeros(1000))
+            self.assertIsNone(cache.get('b'))
+            self.assertIsNotNone(cache.get('a'))
+            self.assertEqual(cache.stats()['evictions'], 2)
+            self.assertEqual(ResultCache(dir_name).stats()['entries'], 2)
+        finally:
+            shutil.rmtree(dir_name)
+
+    def test_memory_tier(self):
+        import shutil
+        import tempfile
+
+        cache = MemoryCache(max_bytes=2500)
+        for k in 'abc':
+            cache.put(k, np.zeros(1000, dtype=np.uint8))
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.stats()['evictions'], 1)
+        self.assertEqual(cache.stats()['entries'], 2)
+
+        dir_name = tempfile.mkdtemp()
+        try:
+            cache = ResultCache(dir_name, memory_bytes=10 ** 6)
+            cache.put('a', np.arange(10))
+            np.testing.assert_array_equal(cache.get('a'), np.arange(10))
+            self.assertEqual(cache.stats()['memory']['hits'], 1)
+            cache = ResultCache(dir_name, memory_bytes=10 ** 6)
+            for _ in range(2):
+                np.testing.assert_array_equal(cache.get('a'), np.arange(10))
+            self.assertEqual(cache.stats()['hits'], 2)
+            self.assertEqual(cache.stats()['memory']['hits'], 1)
+        finally:
+            shutil.rmtree(dir_name)
+
+    def test_pipeline_memory(self):
+        X1 = pd.DataFrame({'a': np.arange(10.), 'b': np.arange(10.) ** 2})
+        X2 = X1 * 10 + 3
+        y = pd.Series(np.arange(10.))
+
+        cache = MemoryCache()
+
+        def pipeline():
+            return pd_pipeline.Pipeline(
+                [('std', pd_preprocessing.StandardScaler()), ('reg', pd_linear_model.LinearRegression())],
+                cache=cache)
+
+        A, B = pipeline().fit(X1, y), pipeline().fit(X1, y)
+        self.assertEqual(cache.stats()['hits'], 1)
+        self.assertIsNot(A.steps[0][1], B.steps[0][1])
+
+        y_hat = B.predict(X1)
+        A.fit(X2, y)
+        self.assertTrue(B.predict(X1).equals(y_hat))
+        np.testing.assert_array_almost_equal(pipeline().fit(X1, y).steps[0][1].mean_, X1.mean().values)
+
+    def test_pipeline(self):
+        import shutil
+        import tempfile
+
+        iris, features = _load_iris()
+        X, y = iris[features], iris['class']
+
+        dir_name = tempfile.mkdtemp()
+        try:
+            cache = ResultCache(dir_name)
+            expected = (pd_decomposition.PCA(n_components=2, random_state=0) | pd_linear_model.LogisticRegression(C=0.5)) \
+                .fit(X, y).predict_proba(X)
+            for C in [0.5, 1.]:
+                clf = pd_pipeline.Pipeline(
+                    [
+                        ('pca', pd_decomposition.PCA(n_components=2, random_state=0)),
+                        ('clf', pd_linear_model.LogisticRegression(C=C)),
+                    ],
+                    cache=cache)
+                clf = base.clone(clf).fit(X, y)
+                if C == 0.5:
+                    np.testing.assert_array_almost_equal(clf.predict_proba(X).values, expected.values)
+            self.assertEqual(cache.stats()['misses'], 1)
+            self.assertEqual(cache.stats()['hits'], 1)
+
+            clf.set_params(pca__n_components=3).fit(X, y)
+            self.assertEqual(cache.stats()['misses'], 2)
+            clf.fit(X.iloc[: -1], y.iloc[: -1])
+            self.assertEqual(cache.stats()['misses'], 3)
+        finally:
+            shutil.rmtree(dir_name)
+
+
+class _InstrumentationTest(unittest.TestCase):
+    def test_profile(self):
+        iris, features = _load_iris()
+        X, y = iris[features], iris['class']
+
+        clf = (pd_decomposition.PCA(n_components=2) + pd_preprocessing.StandardScaler()) | \
+            pd_linear_model.LogisticRegression()
+        seen = []
+        with profile(callback=seen.append, memory=True) as prof:
+            clf.fit(X, y)
+        clf.predict(X)
+
+        self.assertEqual(seen, prof.records)
+        methods = [(r.path[-1], r.method) for r in prof.records]
+        self.assertIn(('PCA', 'fit_transform'), methods)
+        self.assertIn(('StandardScaler', 'fit_transform'), methods)
+        self.assertIn(('LogisticRegression', 'fit'), methods)
+        self.assertEqual(methods[-1], ('Pipeline', 'fit'))
+        union = [r for r in prof.records if r.path[-1] == 'FeatureUnion'][0]
+        self.assertEqual((union.rows_in, union.columns_in), X.shape)
+        self.assertEqual((union.rows_out, union.columns_out), (len(X), 2 + len(features)))
+        self.assertTrue(all(r.wall_time >= 0 and r.peak_bytes is not None for r in prof.records))
+        self.assertListEqual(list(prof.to_frame().estimator), [r.path[-1] for r in prof.records])
+
 
 class _OperatorsTest(unittest.TestCase):
 
@@ -523,6 +1378,46 @@ class _SKLearnTest(unittest.TestCase):
         print(linear_model.LinearRegression)
         print(linear_model.LinearRegression())
 
+    def test_lazy(self):
+        import sys
+        from sklearn import covariance
+        from ibex.sklearn import covariance as pd_covariance
+
+        self.assertIn('EmpiricalCovariance', dir(pd_covariance))
+        if sys.version_info >= (3, 7):
+            self.assertNotIn('EmpiricalCovariance', vars(pd_covariance))
+
+        est = pd_covariance.EmpiricalCovariance
+        self.assertTrue(issubclass(est, covariance.EmpiricalCovariance))
+        self.assertTrue(issubclass(est, FrameMixin))
+        self.assertIn('EmpiricalCovariance', vars(pd_covariance))
+        self.assertIs(pd_covariance.EmpiricalCovariance, est)
+
+        with self.assertRaises(AttributeError):
+            pd_covariance.foo
+
+    def test_module_cache(self):
+        import sys
+        import shutil
+        import tempfile
+        import importlib
+
+        dir_name = tempfile.mkdtemp()
+        prev_cache_dir = os.environ.get('IBEX_CACHE_DIR')
+        os.environ['IBEX_CACHE_DIR'] = dir_name
+        try:
+            for _ in range(2):
+                sys.modules.pop('ibex.sklearn.kernel_ridge', None)
+                pd_kernel_ridge = importlib.import_module('ibex.sklearn.kernel_ridge')
+                self.assertTrue(issubclass(pd_kernel_ridge.KernelRidge, FrameMixin))
+            self.assertEqual(len(glob(os.path.join(dir_name, '*', 'kernel_ridge.bin'))), 1)
+        finally:
+            if prev_cache_dir is None:
+                del os.environ['IBEX_CACHE_DIR']
+            else:
+                os.environ['IBEX_CACHE_DIR'] = prev_cache_dir
+            shutil.rmtree(dir_name)
+
 
 class _ModelSelectionTest(unittest.TestCase):
     def test_cross_val_predict(self):
@@ -544,6 +1439,37 @@ class _ModelSelectionTest(unittest.TestCase):
         self.assertIsInstance(y_hat, pd.Series)
         self.assertEqual(len(y_hat), len(df))
 
+        y_hat_parallel = pd_model_selection.cross_val_predict(
+            pd_linear_model.LinearRegression(),
+            df[['x']],
+            df['y'],
+            n_jobs=2)
+        np.testing.assert_array_almost_equal(y_hat_parallel.values, y_hat.values)
+
+    def test_cross_val_predict_shared(self):
+        from ibex import _shared
+        from ibex.sklearn import model_selection as pd_model_selection
+
+        n = 100
+        df = pd.DataFrame({'x': np.arange(n, dtype=float), 'y': np.arange(n, dtype=float)})
+
+        y_hat = pd_model_selection.cross_val_predict(pd_linear_model.LinearRegression(), df[['x']], df['y'])
+
+        # The frames are shared however small they are, as the estimator never pickles them.
+        published = []
+        orig_publish = _shared._publish
+        _shared._publish = lambda X: published.append(X) or orig_publish(X)
+        try:
+            y_hat_parallel = pd_model_selection.cross_val_predict(
+                pd_linear_model.LinearRegression(),
+                df[['x']],
+                df['y'],
+                n_jobs=2)
+        finally:
+            _shared._publish = orig_publish
+        self.assertEqual(len(published), 2)
+        np.testing.assert_array_almost_equal(y_hat_parallel.values, y_hat.values)
+
     def test_grid_search_fit_predict(self):
         from ibex.sklearn.svm import SVC
         from ibex.sklearn.decomposition import PCA
@@ -604,6 +1530,44 @@ class _PickleTest(unittest.TestCase):
         clf = pd_decomposition.PCA() | pd_linear_model.LinearRegression()
         unpickled_clf = pickle.loads(pickle.dumps(clf))
 
+    def test_fitted_single(self):
+        iris, features = _load_iris()
+
+        clf = pd_linear_model.LogisticRegression().fit(iris[features], iris['class'])
+        unpickled_clf = pickle.loads(pickle.dumps(clf))
+
+        self.assertListEqual(list(unpickled_clf.x_columns), features)
+        self.assertTrue(unpickled_clf.predict(iris[features]).equals(clf.predict(iris[features])))
+
+    def test_fitted_pipe_union(self):
+        iris, features = _load_iris()
+
+        clf = pd_decomposition.PCA(n_components=2) + pd_preprocessing.StandardScaler() | \
+            pd_linear_model.LinearRegression()
+        clf.fit(iris[features], iris['class'])
+        unpickled_clf = pickle.loads(pickle.dumps(clf))
+
+        self.assertTrue(unpickled_clf.predict(iris[features]).equals(clf.predict(iris[features])))
+
+    def test_dump_load_mmap(self):
+        import tempfile
+        import shutil
+
+        iris, features = _load_iris()
+
+        clf = pd_preprocessing.StandardScaler() | pd_ensemble.RandomForestClassifier(n_estimators=3)
+        clf.fit(iris[features], iris['class'])
+
+        dir_name = tempfile.mkdtemp()
+        try:
+            f_name = os.path.join(dir_name, 'clf.pkl')
+            dump(clf, f_name)
+            loaded_clf = load(f_name, mmap_mode='r')
+            self.assertIsInstance(loaded_clf.steps[0][1].scale_, np.memmap)
+            self.assertTrue(loaded_clf.predict(iris[features]).equals(clf.predict(iris[features])))
+        finally:
+            shutil.rmtree(dir_name)
+
 
 def load_tests(loader, tests, ignore):
     import ibex